@@ -0,0 +1,242 @@
+import collections
+import csv
+import re
+from array import array
+import numpy as np
+import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
+
+from sniffer_parser import find_log_files, timed_sections
+
+# Channel load across every section of a capture: stations per channel,
+# BSSID and channel width, a time x channel occupancy matrix, and co-channel
+# crowding events.
+#
+# Parsing is one regex findall per section pulling out the BSSID and the
+# band/chan/ch-width/ht-type column as a single string, tallied with a
+# Counter, so Python only splits each distinct (bssid, channel) of a section
+# - a few dozen - rather than every station. Those are appended as integer
+# codes with their counts to flat arrays, and all counting is then done at
+# once with numpy over the arrays.
+
+CROWD_STATIONS = 30   # stations on one channel in one section
+CROWD_BSSIDS = 3      # distinct BSSIDs (co-channel APs) serving stations on one channel
+OUTPUT_CSV = 'channel_occupancy.csv'
+EVENTS_CSV = 'channel_crowding_events.csv'
+OUTPUT_PLOT = 'channel_occupancy.png'
+
+# mac  bssid  band/chan/ch-width/ht-type  - e.g. 5GHz/36E/80MHz/HE
+STATION_PATTERN = re.compile(r'^[ \t]*[0-9a-fA-F:]{17}[ \t]+([0-9a-fA-F:]{17}[ \t]+[^/\s]+/[^/\s]+/[^/\s]+)',
+                             re.MULTILINE)
+
+
+class Codes(dict):
+    """Interns labels as consecutive integers."""
+
+    def code(self, label):
+        value = self.get(label)
+        if value is None:
+            value = self[label] = len(self)
+        return value
+
+    def labels(self):
+        return sorted(self, key=self.get)
+
+
+def parse_capture(filepath):
+    """Flat arrays of (section, channel, bssid, width) codes and station counts for one capture."""
+    times = []
+    channels, bssids, widths = Codes(), Codes(), Codes()
+    section_ids, channel_ids, bssid_ids, width_ids, counts = (array('i') for _ in range(5))
+
+    for current_time, section in timed_sections(filepath):
+        number = len(times)
+        times.append(current_time)
+        for key, count in collections.Counter(STATION_PATTERN.findall(section)).items():
+            bssid, band_channel = key.split()
+            band, chan, width = band_channel.split('/')[:3]
+            chan = chan.rstrip('E+-')
+            if not chan.isdigit():
+                continue
+            section_ids.append(number)
+            channel_ids.append(channels.code(f"{band}/{chan}"))
+            bssid_ids.append(bssids.code(bssid.lower()))
+            width_ids.append(widths.code(width))
+            counts.append(count)
+
+    return {
+        'times': times,
+        'channels': channels.labels(),
+        'bssids': bssids.labels(),
+        'widths': widths.labels(),
+        'section': np.frombuffer(section_ids, dtype=np.int32),
+        'channel': np.frombuffer(channel_ids, dtype=np.int32),
+        'bssid': np.frombuffer(bssid_ids, dtype=np.int32),
+        'width': np.frombuffer(width_ids, dtype=np.int32),
+        'count': np.frombuffer(counts, dtype=np.int32),
+    }
+
+
+def occupancy(capture):
+    """Sections x channels matrices of station counts and distinct BSSIDs."""
+    n_sections, n_channels = len(capture['times']), len(capture['channels'])
+    cell = capture['section'].astype(np.int64) * n_channels + capture['channel']
+    stations = np.bincount(cell, weights=capture['count'], minlength=n_sections * n_channels)
+    stations = stations.astype(np.int64).reshape(n_sections, n_channels)
+
+    # Distinct (section, channel, bssid) triples, then count them per cell
+    triples = np.unique(cell * len(capture['bssids']) + capture['bssid'])
+    aps = np.bincount(triples // len(capture['bssids']), minlength=n_sections * n_channels)
+    return stations, aps.reshape(n_sections, n_channels)
+
+
+def width_breakdown(capture):
+    """Channels x widths matrix of station samples."""
+    n_widths = len(capture['widths'])
+    counts = np.bincount(capture['channel'].astype(np.int64) * n_widths + capture['width'],
+                         weights=capture['count'], minlength=len(capture['channels']) * n_widths)
+    return counts.astype(np.int64).reshape(len(capture['channels']), n_widths)
+
+
+def bssid_breakdown(capture):
+    """(channel, bssid, mean stations per section) for every pair seen."""
+    n_bssids = len(capture['bssids'])
+    pair = capture['channel'].astype(np.int64) * n_bssids + capture['bssid']
+    totals = np.bincount(pair, weights=capture['count'])
+    n_sections = max(len(capture['times']), 1)
+    return [(capture['channels'][k // n_bssids], capture['bssids'][k % n_bssids], totals[k] / n_sections)
+            for k in np.flatnonzero(totals)]
+
+
+def crowding_events(capture, stations, aps):
+    """Runs of consecutive sections in which a channel is crowded."""
+    crowded = (stations >= CROWD_STATIONS) | (aps >= CROWD_BSSIDS)
+    events = []
+    for channel in np.flatnonzero(crowded.any(axis=0)):
+        column = np.concatenate(([False], crowded[:, channel], [False])).astype(np.int8)
+        edges = np.flatnonzero(np.diff(column))
+        for start, end in zip(edges[::2], edges[1::2]):
+            events.append({
+                'channel': capture['channels'][channel],
+                'start': capture['times'][start],
+                'end': capture['times'][end - 1],
+                'sections': int(end - start),
+                'peak_stations': int(stations[start:end, channel].max()),
+                'peak_bssids': int(aps[start:end, channel].max()),
+            })
+    events.sort(key=lambda e: (e['start'] is None, e['start'] or 0, e['channel']))
+    return events
+
+
+def _channel_sort_key(label):
+    band, chan = label.split('/')
+    return band, int(chan)
+
+
+def plot_occupancy(capture, stations, output_file):
+    order = sorted(range(len(capture['channels'])), key=lambda i: _channel_sort_key(capture['channels'][i]))
+    labels = [capture['channels'][i] for i in order]
+    times = capture['times']
+    timed = [i for i, t in enumerate(times) if t is not None]
+
+    fig, ax = plt.subplots(figsize=(14, max(4, len(labels) * 0.35 + 2)))
+    if timed:
+        x = mdates.date2num([times[i] for i in timed])
+        extent = [x[0], x[-1], len(labels) - 0.5, -0.5]
+        image = ax.imshow(stations[timed][:, order].T, aspect='auto', cmap='viridis', interpolation='nearest',
+                          extent=extent)
+        ax.xaxis_date()
+        ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M:%S'))
+        ax.set_xlabel('Time', fontsize=12, fontweight='bold')
+    else:
+        image = ax.imshow(stations[:, order].T, aspect='auto', cmap='viridis', interpolation='nearest')
+        ax.set_xlabel('Section', fontsize=12, fontweight='bold')
+    fig.colorbar(image, ax=ax).set_label('Stations', fontsize=11, fontweight='bold')
+
+    ax.set_yticks(range(len(labels)))
+    ax.set_yticklabels(labels, fontsize=8)
+    ax.set_ylabel('Band/Channel', fontsize=12, fontweight='bold')
+    ax.set_title('Stations per Channel over Time', fontsize=14, fontweight='bold')
+    plt.xticks(rotation=45, ha='right')
+    plt.tight_layout()
+    plt.savefig(output_file, dpi=150, bbox_inches='tight')
+    print(f"\nPlot saved as: {output_file}")
+
+
+def export_csv(capture, stations, aps, events):
+    with open(OUTPUT_CSV, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['section', 'time'] + [f"{c} stations" for c in capture['channels']]
+                        + [f"{c} bssids" for c in capture['channels']])
+        for i, current_time in enumerate(capture['times']):
+            writer.writerow([i, current_time or ''] + stations[i].tolist() + aps[i].tolist())
+    print(f"Occupancy matrix exported to: {OUTPUT_CSV}")
+
+    with open(EVENTS_CSV, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=['channel', 'start', 'end', 'sections', 'peak_stations',
+                                               'peak_bssids'])
+        writer.writeheader()
+        writer.writerows(events)
+    print(f"Crowding events exported to: {EVENTS_CSV}")
+
+
+def scan_and_plot():
+    """Scan current directory for text files and analyse channel occupancy of the first with data."""
+    txt_files = find_log_files()
+
+    print(f"Found {len(txt_files)} log/txt files in current directory:")
+    for filename in txt_files:
+        print(f"  - {filename}")
+    print()
+
+    capture = None
+    for filename in txt_files:
+        print(f"Checking: {filename}")
+        try:
+            capture = parse_capture(filename)
+        except Exception as e:
+            print(f"  ✗ Error: {e}")
+            continue
+        if len(capture['section']):
+            print(f"  ✓ {len(capture['times'])} sections, {capture['count'].sum()} station samples")
+            break
+        print(f"  ✗ No station lines found")
+        capture = None
+
+    if capture is None:
+        print("\n" + "="*50)
+        print("NO DATA FOUND!")
+        print("="*50)
+        return
+
+    stations, aps = occupancy(capture)
+    events = crowding_events(capture, stations, aps)
+    export_csv(capture, stations, aps, events)
+    plot_occupancy(capture, stations, OUTPUT_PLOT)
+
+    widths = width_breakdown(capture)
+    print(f"\n{'='*50}")
+    print(f"Channel Summary (mean stations per section):")
+    for i in sorted(range(len(capture['channels'])), key=lambda i: _channel_sort_key(capture['channels'][i])):
+        by_width = ', '.join(f"{w}: {n}" for w, n in zip(capture['widths'], widths[i]) if n)
+        print(f"  {capture['channels'][i]:<12} avg {stations[:, i].mean():5.1f}  peak {stations[:, i].max():3d}  "
+              f"max co-channel BSSIDs {aps[:, i].max()}  ({by_width})")
+
+    print(f"\n  Busiest BSSIDs (mean stations per section):")
+    for channel, bssid, mean in sorted(bssid_breakdown(capture), key=lambda r: r[2], reverse=True)[:10]:
+        print(f"    {bssid}  {channel:<12} {mean:.1f}")
+
+    print(f"\n  Co-channel crowding events (>= {CROWD_STATIONS} stations or >= {CROWD_BSSIDS} BSSIDs): "
+          f"{len(events)}")
+    for event in events[:20]:
+        print(f"    {event['channel']:<12} {event['start']} -> {event['end']}  ({event['sections']} sections, "
+              f"peak {event['peak_stations']} stations / {event['peak_bssids']} BSSIDs)")
+    if len(events) > 20:
+        print(f"    ... {len(events) - 20} more in {EVENTS_CSV}")
+    print(f"{'='*50}")
+
+    plt.show()
+
+
+if __name__ == "__main__":
+    scan_and_plot()
@@ -0,0 +1,286 @@
+import hashlib
+import html
+import json
+import multiprocessing
+import os
+import shutil
+import time
+import matplotlib
+matplotlib.use('Agg')  # headless: workers only ever write PNGs
+import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
+
+from sniffer_parser import RSSI, SNR, find_log_files, station_lines, timed_sections
+
+# Batch version of bssid.py, switch.py, rssi.py and skim.py for every client
+# in the captures at once. The captures are parsed a single time into
+# per-client sample lists; each client's BSSID, channel and RSSI/SNR figures
+# and skim-style summary are then rendered by a process pool, and
+# reports/index.html links them all.
+#
+# Rendering is incremental: a hash of each client's samples is kept in
+# reports/manifest.json, and a client whose samples (and RENDER_VERSION) are
+# unchanged since the last run is not redrawn.
+
+OUTPUT_DIR = 'reports'
+MIN_SAMPLES = 5        # clients seen fewer times than this are left out
+WORKERS = None         # process pool size; None = one per CPU
+RENDER_VERSION = 1     # bump when the figures change so every client is redrawn
+MANIFEST = 'manifest.json'
+
+
+def collect_clients(files):
+    """{mac: [(time, bssid, channel, essid, snr, rssi), ...]} over every capture, in time order."""
+    clients = {}
+    for filename in files:
+        print(f"Reading: {filename}")
+        try:
+            for current_time, section in timed_sections(filename):
+                if current_time is None:
+                    continue
+                for parts in station_lines(section):
+                    band_channel = parts[2].split('/')
+                    channel = band_channel[1] if len(band_channel) > 1 else ''
+                    sample = (current_time, parts[1].lower(), channel, parts[3], parts[SNR], parts[RSSI])
+                    clients.setdefault(parts[0].lower(), []).append(sample)
+        except Exception as e:
+            print(f"  ✗ Error: {e}")
+    for samples in clients.values():
+        samples.sort(key=lambda s: s[0])
+    return clients
+
+
+def client_hash(samples):
+    digest = hashlib.sha1(str(RENDER_VERSION).encode())
+    for sample in samples:
+        digest.update(f"{sample[0].isoformat()} {' '.join(sample[1:])}\n".encode())
+    return digest.hexdigest()
+
+
+def _timeline(ax, timestamps, labels, color, label_prefix=''):
+    """Step plot of a categorical value over time, as in bssid.py / switch.py."""
+    unique = sorted(set(labels))
+    to_num = {value: i for i, value in enumerate(unique)}
+    nums = [to_num[value] for value in labels]
+    ax.step(timestamps, nums, where='post', linewidth=2.5, color=color, alpha=0.8, zorder=3)
+    colors = plt.cm.Set3(range(len(unique)))
+    for i, value in enumerate(unique):
+        points = [ts for ts, num in zip(timestamps, nums) if num == i]
+        ax.scatter(points, [i] * len(points), color=colors[i % len(colors)], s=60, label=f'{label_prefix}{value}',
+                   alpha=0.9, edgecolors='black', linewidth=0.5, zorder=5)
+    ax.set_yticks(range(len(unique)))
+    ax.set_yticklabels(unique, fontsize=9)
+    ax.set_ylim(-0.5, len(unique) - 0.5)
+    ax.grid(True, alpha=0.3, linestyle='--', axis='both')
+    ax.legend(loc='upper left', fontsize=8, ncol=2)
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M:%S'))
+    ax.set_xlabel('Time', fontsize=12, fontweight='bold')
+
+
+def _save(fig, path):
+    plt.setp(fig.axes[-1].get_xticklabels(), rotation=45, ha='right')
+    fig.tight_layout()
+    fig.savefig(path, dpi=100)  # tight_layout already fits the labels; bbox_inches='tight' would draw twice
+    plt.close(fig)
+
+
+def _transitions(timestamps, values):
+    return [(timestamps[i - 1], values[i - 1], timestamps[i], values[i])
+            for i in range(1, len(values)) if values[i] != values[i - 1]]
+
+
+def render_client(job):
+    """Draw one client's figures and summary into its directory; returns its index stats."""
+    mac, samples, directory = job
+    os.makedirs(directory, exist_ok=True)
+    timestamps = [s[0] for s in samples]
+    bssids = [s[1] for s in samples]
+    channels = [s[2] for s in samples]
+
+    fig, ax = plt.subplots(figsize=(14, 6))
+    _timeline(ax, timestamps, bssids, 'darkgreen')
+    ax.set_ylabel('BSSID', fontsize=12, fontweight='bold')
+    ax.set_title(f'BSSID Timeline for MAC {mac}', fontsize=14, fontweight='bold')
+    _save(fig, os.path.join(directory, 'bssid_timeline.png'))
+
+    fig, ax = plt.subplots(figsize=(14, 6))
+    _timeline(ax, timestamps, channels, 'steelblue', 'Channel ')
+    ax.set_ylabel('Channel', fontsize=12, fontweight='bold')
+    ax.set_title(f'Channel Timeline for MAC {mac}', fontsize=14, fontweight='bold')
+    _save(fig, os.path.join(directory, 'channel_timeline.png'))
+
+    signal = [(s[0], int(s[5]), int(s[4])) for s in samples if s[5].isdigit() and s[4].isdigit()]
+    if signal:
+        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 10), sharex=True)
+        ax1.plot([s[0] for s in signal], [s[1] for s in signal], linewidth=2, color='crimson', alpha=0.7,
+                 marker='o', markersize=4, label='RSSI')
+        ax1.set_ylabel('RSSI (dBm)', fontsize=12, fontweight='bold')
+        ax1.set_title(f'RSSI and SNR Timeline for MAC {mac}', fontsize=14, fontweight='bold')
+        ax1.grid(True, alpha=0.3, linestyle='--')
+        ax1.legend(loc='upper right', fontsize=10)
+        for level, color in ((80, 'red'), (70, 'orange'), (60, 'green')):
+            ax1.axhline(y=level, color=color, linestyle='--', alpha=0.5, linewidth=1)
+        ax1.invert_yaxis()
+        ax2.plot([s[0] for s in signal], [s[2] for s in signal], linewidth=2, color='steelblue', alpha=0.7,
+                 marker='s', markersize=4, label='SNR')
+        ax2.set_xlabel('Time', fontsize=12, fontweight='bold')
+        ax2.set_ylabel('SNR (dB)', fontsize=12, fontweight='bold')
+        ax2.grid(True, alpha=0.3, linestyle='--')
+        ax2.legend(loc='upper right', fontsize=10)
+        for level, color in ((25, 'green'), (15, 'orange'), (10, 'red')):
+            ax2.axhline(y=level, color=color, linestyle='--', alpha=0.5, linewidth=1)
+        ax2.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M:%S'))
+        _save(fig, os.path.join(directory, 'rssi_timeline.png'))
+
+    rssi_values = [s[1] for s in signal]
+    snr_values = [s[2] for s in signal]
+    stats = {
+        'samples': len(samples),
+        'start': timestamps[0].strftime('%Y-%m-%d %H:%M:%S'),
+        'end': timestamps[-1].strftime('%Y-%m-%d %H:%M:%S'),
+        'essids': sorted(set(s[3] for s in samples)),
+        'bssids': len(set(bssids)),
+        'channels': sorted(set(channels)),
+        'roams': len(_transitions(timestamps, bssids)),
+        'rssi_mean': round(sum(rssi_values) / len(rssi_values), 1) if rssi_values else None,
+        'rssi_max': max(rssi_values) if rssi_values else None,
+        'snr_mean': round(sum(snr_values) / len(snr_values), 1) if snr_values else None,
+        'figures': ['bssid_timeline.png', 'channel_timeline.png'] + (['rssi_timeline.png'] if signal else []),
+    }
+    # A figure from an earlier render that this one no longer draws is stale
+    for name in os.listdir(directory):
+        if name.endswith('.png') and name not in stats['figures']:
+            os.remove(os.path.join(directory, name))
+    _write_summary(mac, samples, stats, os.path.join(directory, 'summary.txt'))
+    return mac, stats
+
+
+def _write_summary(mac, samples, stats, path):
+    """skim.py-style text summary of one client."""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("="*100 + "\n")
+        f.write(f"LOG DATA FOR MAC ADDRESS: {mac}\n")
+        f.write(f"Total entries found: {stats['samples']}\n")
+        f.write(f"Time range: {stats['start']} to {stats['end']}\n")
+        f.write("="*100 + "\n\n")
+        f.write(f"{'Timestamp':<30} {'BSSID':<20} {'Channel':<15} {'ESSID':<20} {'SNR':<5} {'RSSI':<5}\n")
+        f.write("-"*100 + "\n")
+        for current_time, bssid, channel, essid, snr, rssi in samples:
+            f.write(f"{current_time.strftime('%Y-%m-%d %H:%M:%S'):<30} {bssid:<20} {channel:<15} {essid:<20} "
+                    f"{snr:<5} {rssi:<5}\n")
+
+        f.write("\n" + "="*100 + "\n")
+        f.write("STATISTICS\n")
+        f.write("="*100 + "\n\n")
+        for name, index in (('BSSIDs', 1), ('Channels', 2), ('ESSIDs', 3)):
+            counts = {}
+            for sample in samples:
+                counts[sample[index]] = counts.get(sample[index], 0) + 1
+            f.write(f"Unique {name}: {len(counts)}\n")
+            for value in sorted(counts):
+                f.write(f"  {value}: {counts[value]} occurrences\n")
+            f.write("\n")
+        f.write(f"BSSID transitions: {stats['roams']}\n")
+        if stats['rssi_mean'] is not None:
+            f.write(f"RSSI average: {stats['rssi_mean']} dBm (worst {stats['rssi_max']} dBm)\n")
+            f.write(f"SNR average: {stats['snr_mean']} dB\n")
+
+
+def write_index(entries, path):
+    rows = []
+    for mac in sorted(entries):
+        stats = entries[mac]['stats']
+        directory = entries[mac]['directory']
+        links = ' '.join(f'<a href="{directory}/{html.escape(figure)}">{figure.split("_")[0]}</a>'
+                         for figure in stats['figures'])
+        rows.append(
+            f"<tr><td><a href=\"{directory}/summary.txt\">{html.escape(mac)}</a></td>"
+            f"<td>{stats['samples']}</td><td>{stats['start']}</td><td>{stats['end']}</td>"
+            f"<td>{html.escape(', '.join(stats['essids']))}</td><td>{stats['bssids']}</td>"
+            f"<td>{html.escape(', '.join(stats['channels']))}</td><td>{stats['roams']}</td>"
+            f"<td>{'' if stats['rssi_mean'] is None else stats['rssi_mean']}</td>"
+            f"<td>{'' if stats['snr_mean'] is None else stats['snr_mean']}</td><td>{links}</td></tr>")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>Client Reports</title>\n"
+                "<style>body{font-family:sans-serif}table{border-collapse:collapse}"
+                "td,th{border:1px solid #ccc;padding:4px 8px;font-size:13px}th{background:#eee}"
+                "td:first-child{font-family:monospace}</style></head><body>\n")
+        f.write(f"<h1>Client Reports</h1>\n<p>{len(rows)} clients, generated "
+                f"{time.strftime('%Y-%m-%d %H:%M:%S')}</p>\n")
+        f.write("<table>\n<tr><th>MAC</th><th>Samples</th><th>First seen</th><th>Last seen</th><th>ESSIDs</th>"
+                "<th>BSSIDs</th><th>Channels</th><th>Roams</th><th>Avg RSSI</th><th>Avg SNR</th>"
+                "<th>Figures</th></tr>\n")
+        f.write('\n'.join(rows))
+        f.write("\n</table>\n</body></html>\n")
+
+
+def generate_reports():
+    """Parse every log/txt file in the current directory once and (re)render changed clients."""
+    start = time.perf_counter()
+    txt_files = find_log_files()
+    print(f"Found {len(txt_files)} log/txt files in current directory:")
+    for filename in txt_files:
+        print(f"  - {filename}")
+    print()
+
+    clients = {mac: samples for mac, samples in collect_clients(txt_files).items() if len(samples) >= MIN_SAMPLES}
+    parse_time = time.perf_counter() - start
+    if not clients:
+        print("\n" + "="*50)
+        print("NO DATA FOUND!")
+        print(f"No client seen at least {MIN_SAMPLES} times in {len(txt_files)} files")
+        print("="*50)
+        return
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    manifest_path = os.path.join(OUTPUT_DIR, MANIFEST)
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+    except (OSError, ValueError):
+        previous = {}
+
+    entries = {}
+    jobs = []
+    for mac, samples in clients.items():
+        directory = mac.replace(':', '')
+        digest = client_hash(samples)
+        old = previous.get(mac)
+        if (old and old['hash'] == digest
+                and all(os.path.exists(os.path.join(OUTPUT_DIR, directory, figure)) for figure in old['stats']['figures'])):
+            entries[mac] = old
+            continue
+        entries[mac] = {'hash': digest, 'directory': directory}
+        jobs.append((mac, samples, os.path.join(OUTPUT_DIR, directory)))
+
+    # Clients that have dropped out of the captures lose their reports
+    for mac, old in previous.items():
+        if mac not in clients:
+            shutil.rmtree(os.path.join(OUTPUT_DIR, old['directory']), ignore_errors=True)
+
+    print(f"\n{len(clients)} clients, {len(jobs)} changed since the last run, {len(clients) - len(jobs)} up to date")
+    render_start = time.perf_counter()
+    if jobs:
+        with multiprocessing.Pool(WORKERS) as pool:
+            for done, (mac, stats) in enumerate(pool.imap_unordered(render_client, jobs), 1):
+                entries[mac]['stats'] = stats
+                if done % 50 == 0 or done == len(jobs):
+                    print(f"  Rendered {done}/{len(jobs)}")
+    render_time = time.perf_counter() - render_start
+
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(entries, f, indent=1)
+    index_path = os.path.join(OUTPUT_DIR, 'index.html')
+    write_index(entries, index_path)
+
+    print(f"\n{'='*50}")
+    print(f"Summary:")
+    print(f"  Clients: {len(clients)} (re-rendered {len(jobs)})")
+    print(f"  Parse time: {parse_time:.2f}s")
+    print(f"  Render time: {render_time:.2f}s")
+    print(f"  Index: {index_path}")
+    print(f"{'='*50}")
+
+
+if __name__ == "__main__":
+    generate_reports()
@@ -0,0 +1,163 @@
+import csv
+import math
+import numpy as np
+import matplotlib.pyplot as plt
+
+from sniffer_parser import RSSI, SNR, find_log_files, timed_sections, station_lines
+
+# BSSID x client RSSI/SNR matrix over every capture in the current directory.
+# Each (bssid, mac) pair seen gets one running summary, so memory grows with
+# the number of pairs observed, not with the number of samples.
+
+MAX_CLIENTS = 60   # heatmap columns: the clients with the most samples
+MAX_BSSIDS = 40    # heatmap rows: the BSSIDs with the most samples
+OUTPUT_CSV = 'rssi_matrix.csv'
+OUTPUT_PLOT = 'rssi_matrix_heatmap.png'
+
+# Summary slots: samples and (sum, sum of squares, min, max) of RSSI, then the
+# same for SNR, which some lines leave blank
+COUNT, RSSI_SUM, RSSI_SQ, RSSI_MIN, RSSI_MAX, SNR_COUNT, SNR_SUM, SNR_SQ, SNR_MIN, SNR_MAX = range(10)
+
+
+def accumulate(filepath, matrix):
+    """Fold every station sample of one file into `matrix` ((bssid, mac) -> summary)."""
+    sections = samples = 0
+    for current_time, section in timed_sections(filepath):
+        sections += 1
+        for parts in station_lines(section):
+            rssi, snr = parts[RSSI], parts[SNR]
+            if not rssi.isdigit():
+                continue
+            rssi = int(rssi)
+            snr = int(snr) if snr.isdigit() else None
+            key = (parts[1].lower(), parts[0].lower())
+            summary = matrix.get(key)
+            if summary is None:
+                summary = matrix[key] = [0, 0, 0, rssi, rssi, 0, 0, 0, None, None]
+            summary[COUNT] += 1
+            summary[RSSI_SUM] += rssi
+            summary[RSSI_SQ] += rssi * rssi
+            if rssi < summary[RSSI_MIN]:
+                summary[RSSI_MIN] = rssi
+            if rssi > summary[RSSI_MAX]:
+                summary[RSSI_MAX] = rssi
+            if snr is not None:
+                summary[SNR_COUNT] += 1
+                summary[SNR_SUM] += snr
+                summary[SNR_SQ] += snr * snr
+                if summary[SNR_MIN] is None or snr < summary[SNR_MIN]:
+                    summary[SNR_MIN] = snr
+                if summary[SNR_MAX] is None or snr > summary[SNR_MAX]:
+                    summary[SNR_MAX] = snr
+            samples += 1
+    print(f"  {sections} sections, {samples} station samples")
+    return samples
+
+
+def mean_std(total, squares, count):
+    if not count:
+        return None, None
+    mean = total / count
+    return mean, math.sqrt(max(squares / count - mean * mean, 0.0))
+
+
+def export_csv(matrix, output_file):
+    """One row per observed (bssid, mac) pair - the sparse matrix in long form."""
+    with open(output_file, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['bssid', 'mac', 'samples', 'rssi_mean', 'rssi_std', 'rssi_min', 'rssi_max',
+                         'snr_mean', 'snr_std', 'snr_min', 'snr_max'])
+        for (bssid, mac), s in sorted(matrix.items()):
+            rssi_mean, rssi_std = mean_std(s[RSSI_SUM], s[RSSI_SQ], s[COUNT])
+            snr_mean, snr_std = mean_std(s[SNR_SUM], s[SNR_SQ], s[SNR_COUNT])
+            writer.writerow([bssid, mac, s[COUNT], f"{rssi_mean:.1f}", f"{rssi_std:.1f}", s[RSSI_MIN], s[RSSI_MAX],
+                             '' if snr_mean is None else f"{snr_mean:.1f}",
+                             '' if snr_std is None else f"{snr_std:.1f}",
+                             '' if s[SNR_MIN] is None else s[SNR_MIN],
+                             '' if s[SNR_MAX] is None else s[SNR_MAX]])
+
+
+def top_keys(matrix, index):
+    """BSSIDs (index 0) or clients (index 1) ordered by total sample count."""
+    totals = {}
+    for key, summary in matrix.items():
+        totals[key[index]] = totals.get(key[index], 0) + summary[COUNT]
+    return sorted(totals, key=totals.get, reverse=True)
+
+
+def plot_heatmap(matrix, output_file):
+    bssids = top_keys(matrix, 0)[:MAX_BSSIDS]
+    clients = top_keys(matrix, 1)[:MAX_CLIENTS]
+    rows = {bssid: i for i, bssid in enumerate(bssids)}
+    columns = {mac: j for j, mac in enumerate(clients)}
+
+    grid = np.full((len(bssids), len(clients)), np.nan)
+    for (bssid, mac), summary in matrix.items():
+        if bssid in rows and mac in columns:
+            grid[rows[bssid], columns[mac]] = summary[RSSI_SUM] / summary[COUNT]
+
+    fig, ax = plt.subplots(figsize=(max(8, len(clients) * 0.3 + 3), max(5, len(bssids) * 0.3 + 2)))
+    # Lower RSSI value = stronger signal, so reverse the colormap to keep green = good
+    image = ax.imshow(np.ma.masked_invalid(grid), aspect='auto', cmap='RdYlGn_r', interpolation='nearest')
+    cbar = fig.colorbar(image, ax=ax)
+    cbar.set_label('Mean RSSI (dBm)', fontsize=11, fontweight='bold')
+
+    ax.set_xticks(range(len(clients)))
+    ax.set_xticklabels(clients, rotation=90, fontsize=7, family='monospace')
+    ax.set_yticks(range(len(bssids)))
+    ax.set_yticklabels(bssids, fontsize=7, family='monospace')
+    ax.set_xlabel('Client MAC', fontsize=12, fontweight='bold')
+    ax.set_ylabel('BSSID', fontsize=12, fontweight='bold')
+    ax.set_title('Mean RSSI per AP x Client', fontsize=14, fontweight='bold')
+
+    plt.tight_layout()
+    plt.savefig(output_file, dpi=150, bbox_inches='tight')
+    print(f"\nHeatmap saved as: {output_file}")
+
+
+def scan_and_plot():
+    """Scan every log/txt file in the current directory into one matrix."""
+    matrix = {}
+    txt_files = find_log_files()
+
+    print(f"Found {len(txt_files)} log/txt files in current directory:")
+    for filename in txt_files:
+        print(f"  - {filename}")
+    print()
+
+    total_samples = 0
+    for filename in txt_files:
+        print(f"Reading: {filename}")
+        try:
+            total_samples += accumulate(filename, matrix)
+        except Exception as e:
+            print(f"  ✗ Error: {e}")
+
+    if not matrix:
+        print("\n" + "="*50)
+        print("NO DATA FOUND!")
+        print(f"Checked {len(txt_files)} files, none had station lines")
+        print("="*50)
+        return
+
+    export_csv(matrix, OUTPUT_CSV)
+    print(f"\nMatrix exported to: {OUTPUT_CSV}")
+    plot_heatmap(matrix, OUTPUT_PLOT)
+
+    bssids = {bssid for bssid, mac in matrix}
+    clients = {mac for bssid, mac in matrix}
+    print(f"\n{'='*50}")
+    print(f"Summary:")
+    print(f"  Files read: {len(txt_files)}")
+    print(f"  Station samples: {total_samples}")
+    print(f"  BSSIDs: {len(bssids)}")
+    print(f"  Clients: {len(clients)}")
+    print(f"  Observed pairs: {len(matrix)} of {len(bssids) * len(clients)} "
+          f"({len(matrix) / (len(bssids) * len(clients)) * 100:.1f}% filled)")
+    print(f"{'='*50}")
+
+    plt.show()
+
+
+if __name__ == "__main__":
+    scan_and_plot()
@@ -0,0 +1,274 @@
+import bisect
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+from datetime import datetime
+
+from sniffer_parser import find_log_files, station_lines, timed_sections
+
+# Compact archive of parsed Sniffer Mode captures.
+#
+# Consecutive sections repeat nearly the same station table - mostly only
+# snr/rssi and the age columns move - so each section is stored as a delta
+# against the previous one. Stations are numbered by slot within a block (in
+# keyframe order, new stations appended), so a delta never repeats a MAC:
+#   'del'  slots of stations that disappeared
+#   'add'  [mac, columns] of stations that appeared (or changed column count)
+#   'chg'  [column, slots, values] per column that changed, slots ascending;
+#          slots is 0 when every live station changed (the age columns do
+#          in nearly every section), which saves listing them
+# Every KEYFRAME_INTERVAL sections a keyframe ('key', [[mac, columns], ...])
+# stores the full table instead. A keyframe and the deltas after it form one
+# zlib-compressed block; an index of block offsets and section times at the
+# end of the file lets a reader seek to any section by decompressing one block
+# and replaying at most KEYFRAME_INTERVAL - 1 deltas.
+#
+#   python sniffer_archive.py                   archive every .txt/.log here
+#   python sniffer_archive.py capture.sarc 120  print section 120 of an archive
+#
+# Only station lines and LocalBeginTime are kept; banner and header lines of
+# the original dump are not.
+
+KEYFRAME_INTERVAL = 64
+COMPRESSION_LEVEL = 6
+EXTENSION = '.sarc'
+
+MAGIC = b'SNIFARC1'
+HEADER = struct.Struct('<8sI')   # magic, keyframe interval
+FOOTER = struct.Struct('<QI8s')  # index offset, index length, magic
+
+
+def station_table(section):
+    """{mac: [bssid, band/chan/..., essid, ...]} for one section."""
+    return {parts[0].lower(): parts[1:] for parts in station_lines(section)}
+
+
+class _Block:
+    """Slot bookkeeping for the block being written."""
+
+    def __init__(self, table):
+        self.slots = {mac: slot for slot, mac in enumerate(table)}
+        self.next_slot = len(self.slots)
+
+    def keyframe(self, table):
+        return {'key': [[mac, columns] for mac, columns in table.items()]}
+
+    def delta(self, previous, current):
+        """The delta entry turning `previous` into `current`."""
+        slots = self.slots
+        removed = [slots.pop(mac) for mac in previous if mac not in current or len(previous[mac]) != len(current[mac])]
+        added = []
+        changed = {}
+        for mac, columns in current.items():
+            slot = slots.get(mac)
+            if slot is None:
+                slots[mac] = self.next_slot
+                self.next_slot += 1
+                added.append([mac, columns])
+                continue
+            old = previous[mac]
+            if old != columns:
+                for i, (was, value) in enumerate(zip(old, columns)):
+                    if was != value:
+                        changed.setdefault(i, []).append((slot, value))
+        entry = {}
+        if removed:
+            entry['del'] = removed
+        if added:
+            entry['add'] = added
+        if changed:
+            live = len(slots) - len(added)  # stations a change could apply to
+            entry['chg'] = []
+            for i, pairs in changed.items():
+                pairs.sort()
+                slots_changed = 0 if len(pairs) == live else [slot for slot, value in pairs]
+                entry['chg'].append([i, slots_changed, [value for slot, value in pairs]])
+        return entry
+
+
+def apply_entry(rows, macs, entry):
+    """Apply a keyframe or delta to the slot lists `rows` (columns) and `macs` in place."""
+    if 'key' in entry:
+        macs[:] = [mac for mac, columns in entry['key']]
+        rows[:] = [columns for mac, columns in entry['key']]
+        return
+    for slot in entry.get('del', ()):
+        rows[slot] = macs[slot] = None
+    added = 0
+    for mac, columns in entry.get('add', ()):
+        macs.append(mac)
+        rows.append(columns)
+        added += 1
+    changes = entry.get('chg')
+    if changes:
+        live = None
+        for column, slots, values in changes:
+            if not slots:
+                if live is None:
+                    live = [slot for slot, mac in enumerate(macs) if mac is not None and slot < len(macs) - added]
+                slots = live
+            for slot, value in zip(slots, values):
+                rows[slot][column] = value
+
+
+def write_archive(filepath, output_file, keyframe_interval=KEYFRAME_INTERVAL):
+    """Archive one capture; returns the number of sections written."""
+    index = []  # [offset, length, first section, [section times]] per block
+    entries = []
+    times = []
+    previous = {}
+    block = None
+
+    with open(output_file, 'wb') as out:
+        out.write(HEADER.pack(MAGIC, keyframe_interval))
+
+        def flush():
+            data = zlib.compress(('\n'.join(entries)).encode(), COMPRESSION_LEVEL)
+            index.append([out.tell(), len(data), count - len(entries), list(times)])
+            out.write(data)
+            entries.clear()
+            times.clear()
+
+        count = 0
+        for current_time, section in timed_sections(filepath):
+            table = station_table(section)
+            if count % keyframe_interval == 0:
+                if entries:
+                    flush()
+                block = _Block(table)
+                entry = block.keyframe(table)
+            else:
+                entry = block.delta(previous, table)
+            entries.append(json.dumps(entry, separators=(',', ':')))
+            times.append(current_time.isoformat() if current_time else None)
+            previous = table
+            count += 1
+        if entries:
+            flush()
+
+        data = zlib.compress(json.dumps({'sections': count, 'blocks': index}).encode(), COMPRESSION_LEVEL)
+        offset = out.tell()
+        out.write(data)
+        out.write(FOOTER.pack(offset, len(data), MAGIC))
+    return count
+
+
+def _table(rows, macs):
+    return {mac: columns for mac, columns in zip(macs, rows) if mac is not None}
+
+
+class SnifferArchive:
+    """Random and sequential access to the sections of a .sarc file."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            magic, self.keyframe_interval = HEADER.unpack(f.read(HEADER.size))
+            f.seek(-FOOTER.size, os.SEEK_END)
+            offset, length, end_magic = FOOTER.unpack(f.read(FOOTER.size))
+            if magic != MAGIC or end_magic != MAGIC:
+                raise ValueError(f"{path} is not a sniffer archive")
+            f.seek(offset)
+            index = json.loads(zlib.decompress(f.read(length)))
+        self.count = index['sections']
+        self.blocks = index['blocks']
+        self.starts = [block[2] for block in self.blocks]
+        self.times = [datetime.fromisoformat(t) if t else None for block in self.blocks for t in block[3]]
+
+    def __len__(self):
+        return self.count
+
+    def _entries(self, block):
+        offset, length = self.blocks[block][:2]
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            data = zlib.decompress(f.read(length))
+        return [json.loads(line) for line in data.decode().split('\n')]
+
+    def section(self, number):
+        """(time, {mac: columns}) of section `number`, rebuilt from its keyframe."""
+        if not 0 <= number < self.count:
+            raise IndexError(number)
+        block = bisect.bisect_right(self.starts, number) - 1
+        rows, macs = [], []
+        for entry in self._entries(block)[:number - self.starts[block] + 1]:
+            apply_entry(rows, macs, entry)
+        return self.times[number], _table(rows, macs)
+
+    def section_at(self, when):
+        """The last section that began at or before `when` (a datetime)."""
+        known = [(t, i) for i, t in enumerate(self.times) if t is not None]
+        position = bisect.bisect_right([t for t, i in known], when) - 1
+        if position < 0:
+            raise IndexError(when)
+        return self.section(known[position][1])
+
+    def sections(self):
+        """Yield (time, table) for every section in order, one block in memory at a time.
+
+        The column lists are updated in place by later sections; copy them to
+        keep a table past the next iteration.
+        """
+        rows, macs = [], []
+        number = 0
+        for block in range(len(self.blocks)):
+            for entry in self._entries(block):
+                apply_entry(rows, macs, entry)
+                yield self.times[number], _table(rows, macs)
+                number += 1
+
+
+def archive_and_compare():
+    """Archive every log/txt file in the current directory and report the savings."""
+    txt_files = find_log_files()
+
+    print(f"Found {len(txt_files)} log/txt files in current directory:")
+    for filename in txt_files:
+        print(f"  - {filename}")
+    print()
+
+    for filename in txt_files:
+        output_file = os.path.splitext(filename)[0] + EXTENSION
+        print(f"Archiving: {filename}")
+        try:
+            start = time.perf_counter()
+            count = write_archive(filename, output_file)
+            write_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            parsed = sum(len(station_table(section)) for _, section in timed_sections(filename))
+            parse_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            loaded = sum(len(table) for _, table in SnifferArchive(output_file).sections())
+            load_time = time.perf_counter() - start
+        except Exception as e:
+            print(f"  ✗ Error: {e}")
+            continue
+
+        source_size = os.path.getsize(filename)
+        archive_size = os.path.getsize(output_file)
+        print(f"  ✓ {count} sections, {loaded} station rows -> {output_file} ({write_time:.2f}s)")
+        if loaded != parsed:
+            print(f"  ✗ Archive holds {loaded} station rows, capture has {parsed}")
+        print(f"  Size: {source_size:,} -> {archive_size:,} bytes ({source_size / max(archive_size, 1):.1f}x smaller)")
+        print(f"  Load: reparse {parse_time:.2f}s, archive {load_time:.2f}s "
+              f"({parse_time / max(load_time, 1e-9):.1f}x faster)")
+
+
+def print_section(path, number):
+    archive = SnifferArchive(path)
+    section_time, table = archive.section(number)
+    print(f"Section {number} of {len(archive)} - LocalBeginTime: {section_time}")
+    for mac, columns in table.items():
+        print(f"{mac}  {'  '.join(columns)}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        print_section(sys.argv[1], int(sys.argv[2]))
+    else:
+        archive_and_compare()
@@ -0,0 +1,72 @@
+import os
+import re
+from datetime import datetime
+
+# Shared streaming reader for Sniffer Mode captures.
+#
+# A capture is a sequence of "show ap client-table"-style dumps separated by
+# '/////'. Each dump carries a LocalBeginTime line and one line per station:
+#   mac bssid band/chan/ch-width/ht-type essid sta-type auth dt/mt ut/it snr rssi cl-delay snr/rssi-age report-age
+#
+# Files are read in fixed-size chunks and handed out one section at a time,
+# so memory stays bounded by the largest section rather than the capture.
+
+CHUNK_SIZE = 1 << 20
+DELIMITER = '/////'
+TIME_PATTERN = re.compile(r'LocalBeginTime:\s*(\d+)\s*\(([^)]+)\)')
+MAC_PATTERN = re.compile(r'[0-9a-fA-F]{2}(?::[0-9a-fA-F]{2}){5}$')
+
+COLUMNS = ['mac', 'bssid', 'band_channel', 'essid', 'sta_type', 'auth', 'dt_mt', 'ut_it',
+           'snr', 'rssi', 'cl_delay', 'snr_rssi_age', 'report_age']
+SNR = 8
+RSSI = 9
+
+
+def find_log_files(directory='.'):
+    """The .txt/.log files a Sniffer Mode script scans, in directory order."""
+    return [f for f in os.listdir(directory) if f.endswith('.txt') or f.endswith('.log')]
+
+
+def read_sections(filepath, chunk_size=CHUNK_SIZE):
+    """Yield the '/////'-separated sections of a file without reading it whole."""
+    pending = ''
+    with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            pieces = (pending + chunk).split(DELIMITER)
+            pending = pieces.pop()
+            yield from pieces
+    yield pending
+
+
+def parse_time(section):
+    """LocalBeginTime of a section as a datetime, or None if absent or unreadable."""
+    time_match = TIME_PATTERN.search(section)
+    if not time_match:
+        return None
+    time_str = time_match.group(2)
+    try:
+        # Format: 2025-10-24T11:32:14.662-0400
+        return datetime.strptime(time_str.split('.')[0], '%Y-%m-%dT%H:%M:%S')
+    except ValueError:
+        print(f"  Warning: couldn't parse timestamp '{time_str}'")
+        return None
+
+
+def timed_sections(filepath):
+    """Yield (time, section); a section without LocalBeginTime keeps the previous time."""
+    current_time = None
+    for section in read_sections(filepath):
+        if 'LocalBeginTime' in section:
+            current_time = parse_time(section)
+        yield current_time, section
+
+
+def station_lines(section):
+    """Yield the split columns of every station line in a section."""
+    for line in section.split('\n'):
+        parts = line.split()
+        if len(parts) > RSSI and MAC_PATTERN.match(parts[0]):
+            yield parts
@@ -0,0 +1,268 @@
+import csv
+import re
+import sys
+from datetime import datetime
+
+from sniffer_parser import COLUMNS, MAC_PATTERN, RSSI, SNR, find_log_files, parse_time, read_sections
+
+# Ad-hoc questions over Sniffer Mode captures without a new copy of a script:
+#
+#   python sniffer_query.py channel=36 rssi_min=76 start=11:30 end=11:45
+#   python sniffer_query.py essid=eduroam group_by=bssid,mac
+#   python sniffer_query.py mac=4c:49:6c:d4:db:a9 fields=time,bssid,channel,rssi
+#
+# Filters are applied as early as they can be decided, cheapest first:
+#   section  time range from LocalBeginTime; MAC/BSSID/ESSID literals must
+#            appear somewhere in the section - otherwise it is never split
+#   line     the same literals must appear in the raw line before it is split
+#   columns  exact column checks on the split line; RSSI/SNR converted to int
+#            only when there is a threshold on them
+# Only the projected fields of a surviving line are put into a record.
+#
+# RSSI is reported as a positive magnitude (65 means -65 dBm), so "worse than
+# 75" is rssi_min=76.
+
+QUERY = dict(
+    mac=None,        # client MAC(s), comma separated
+    bssid=None,      # AP BSSID(s)
+    essid=None,      # ESSID(s), exact match
+    band=None,       # e.g. 5GHz, 2.4GHz
+    channel=None,    # e.g. 36, 149 (the E/+/- suffixes are ignored)
+    start=None,      # HH:MM[:SS] time of day, or YYYY-MM-DDTHH:MM:SS
+    end=None,
+    rssi_min=None, rssi_max=None,
+    snr_min=None, snr_max=None,
+    fields=None,     # projection, e.g. time,mac,rssi (default: every column)
+    group_by=None,   # e.g. bssid,mac - aggregate instead of listing records
+)
+OUTPUT_CSV = None    # also write the result to this file
+
+# Fields a record can have: the station columns plus values derived from them
+FIELDS = ['time', 'file'] + COLUMNS + ['band', 'channel']
+
+
+def _split(value):
+    if value is None or value == '':
+        return None
+    if isinstance(value, str):
+        value = value.split(',')
+    return [v.strip() for v in value if v.strip()]
+
+
+def _value_set(value, normalise=None):
+    values = _split(value)
+    if not values:
+        return None
+    return {normalise(v) for v in values} if normalise else set(values)
+
+
+def _parse_bound(value):
+    """A time-of-day (datetime.time) or absolute (datetime) range bound."""
+    if value is None or isinstance(value, datetime):
+        return value
+    for fmt in ('%H:%M:%S', '%H:%M'):
+        try:
+            return datetime.strptime(value, fmt).time()
+        except ValueError:
+            pass
+    return datetime.strptime(value.replace(' ', 'T'), '%Y-%m-%dT%H:%M:%S')
+
+
+def _channel_number(band_channel):
+    parts = band_channel.split('/')
+    return re.sub(r'\D', '', parts[1]) if len(parts) > 1 else ''
+
+
+class Query:
+    """Compiled filters, projection and grouping over station records."""
+
+    def __init__(self, mac=None, bssid=None, essid=None, band=None, channel=None, start=None, end=None,
+                 rssi_min=None, rssi_max=None, snr_min=None, snr_max=None, fields=None, group_by=None):
+        self.macs = _value_set(mac, str.lower)
+        self.bssids = _value_set(bssid, str.lower)
+        self.essids = _value_set(essid)
+        self.bands = _value_set(band, str.lower)
+        self.channels = _value_set(channel, lambda c: re.sub(r'\D', '', c))
+        self.start = _parse_bound(start)
+        self.end = _parse_bound(end)
+        self.rssi_range = (_int(rssi_min), _int(rssi_max))
+        self.snr_range = (_int(snr_min), _int(snr_max))
+        self.group_by = _split(group_by)
+        if self.group_by:
+            # Grouping only needs the keys and the values it aggregates
+            self.fields = self.group_by + [f for f in ('rssi', 'snr') if f not in self.group_by]
+        else:
+            self.fields = _split(fields) or list(FIELDS)
+        for field in self.fields + (self.group_by or []):
+            if field not in FIELDS:
+                raise ValueError(f"Unknown field '{field}' (choose from {', '.join(FIELDS)})")
+
+        # Literals every matching line must contain, checked on raw text. MACs
+        # and BSSIDs are matched case-insensitively; each set needs one hit.
+        self.patterns = []
+        for values in (self.macs, self.bssids):
+            if values:
+                self.patterns.append(re.compile('|'.join(re.escape(v) for v in values), re.IGNORECASE))
+        if self.essids:
+            self.patterns.append(re.compile('|'.join(re.escape(v) for v in self.essids)))
+
+        # Column index to copy out per projected field, in output order; None
+        # for time/file/derived fields, which are filled in separately
+        self.projection = [(field, COLUMNS.index(field) if field in COLUMNS else None) for field in self.fields]
+
+    # Section stage
+
+    def time_matches(self, current_time):
+        if self.start is None and self.end is None:
+            return True
+        if current_time is None:
+            return False
+        for bound, after in ((self.start, True), (self.end, False)):
+            if bound is None:
+                continue
+            value = current_time.time() if not isinstance(bound, datetime) else current_time
+            if (value < bound) if after else (value > bound):
+                return False
+        return True
+
+    def section_matches(self, section):
+        return all(pattern.search(section) for pattern in self.patterns)
+
+    # Line stage
+
+    def line_record(self, line, current_time, filename):
+        """The projected record for one raw line, or None as soon as it is rejected."""
+        for pattern in self.patterns:
+            if not pattern.search(line):
+                return None
+        parts = line.split()
+        if len(parts) <= RSSI or not MAC_PATTERN.match(parts[0]):
+            return None
+        if self.macs and parts[0].lower() not in self.macs:
+            return None
+        if self.bssids and parts[1].lower() not in self.bssids:
+            return None
+        if self.essids and parts[3] not in self.essids:
+            return None
+        if self.bands and parts[2].split('/')[0].lower() not in self.bands:
+            return None
+        if self.channels and _channel_number(parts[2]) not in self.channels:
+            return None
+        for index, (low, high) in ((RSSI, self.rssi_range), (SNR, self.snr_range)):
+            if low is None and high is None:
+                continue
+            if not parts[index].isdigit():
+                return None
+            value = int(parts[index])
+            if (low is not None and value < low) or (high is not None and value > high):
+                return None
+
+        record = {}
+        for field, index in self.projection:
+            if index is not None:
+                record[field] = parts[index] if index < len(parts) else ''
+            elif field == 'time':
+                record[field] = current_time
+            elif field == 'file':
+                record[field] = filename
+            elif field == 'band':
+                record[field] = parts[2].split('/')[0]
+            else:
+                record[field] = _channel_number(parts[2])
+        return record
+
+    def records(self, filepath):
+        """Yield every record of one capture that passes the filters."""
+        current_time = None
+        needs_time = 'time' in self.fields or self.start is not None or self.end is not None
+        for section in read_sections(filepath):
+            if needs_time and 'LocalBeginTime' in section:
+                current_time = parse_time(section)
+            if not self.time_matches(current_time) or not self.section_matches(section):
+                continue
+            for line in section.split('\n'):
+                record = self.line_record(line, current_time, filepath)
+                if record is not None:
+                    yield record
+
+    def run(self, files):
+        """Records (or grouped rows when group_by is set) over several captures."""
+        stream = (record for filepath in files for record in self.records(filepath))
+        if not self.group_by:
+            return list(stream)
+        return self.aggregate(stream)
+
+    def aggregate(self, records):
+        """One row per group: count and RSSI/SNR mean, min and max."""
+        groups = {}
+        for record in records:
+            key = tuple(record[field] for field in self.group_by)
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = [0, 0, None, None, 0, 0, None, None]  # count, sum, min, max for RSSI, SNR
+            for offset, field in ((0, 'rssi'), (4, 'snr')):
+                value = record.get(field, '')
+                if not value.isdigit():
+                    continue
+                value = int(value)
+                group[offset] += 1
+                group[offset + 1] += value
+                if group[offset + 2] is None or value < group[offset + 2]:
+                    group[offset + 2] = value
+                if group[offset + 3] is None or value > group[offset + 3]:
+                    group[offset + 3] = value
+        rows = []
+        for key, group in sorted(groups.items(), key=lambda item: tuple(str(k) for k in item[0])):
+            row = dict(zip(self.group_by, key))
+            row['samples'] = max(group[0], group[4])
+            for offset, name in ((0, 'rssi'), (4, 'snr')):
+                count = group[offset]
+                row[f'{name}_mean'] = round(group[offset + 1] / count, 1) if count else ''
+                row[f'{name}_min'] = group[offset + 2] if count else ''
+                row[f'{name}_max'] = group[offset + 3] if count else ''
+            rows.append(row)
+        return rows
+
+
+def _int(value):
+    return None if value is None or value == '' else int(value)
+
+
+def print_table(rows):
+    if not rows:
+        return
+    columns = list(rows[0])
+    cells = [[str(row[c]) if row[c] is not None else '' for c in columns] for row in rows]
+    widths = [max(len(c), *(len(r[i]) for r in cells)) for i, c in enumerate(columns)]
+    print('  '.join(c.upper().ljust(w) for c, w in zip(columns, widths)))
+    print('-' * (sum(widths) + 2 * (len(widths) - 1)))
+    for r in cells:
+        print('  '.join(v.ljust(w) for v, w in zip(r, widths)))
+
+
+def main():
+    query = dict(QUERY)
+    for arg in sys.argv[1:]:
+        key, _, value = arg.partition('=')
+        if key not in query:
+            print(f"Unknown option '{key}' (choose from {', '.join(query)})")
+            sys.exit(1)
+        query[key] = value
+    query = Query(**query)
+
+    txt_files = find_log_files()
+    print(f"Querying {len(txt_files)} log/txt files in current directory")
+    rows = query.run(txt_files)
+    print_table(rows)
+
+    print(f"\n{len(rows)} {'groups' if query.group_by else 'records'}")
+    if OUTPUT_CSV and rows:
+        with open(OUTPUT_CSV, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"Saved to: {OUTPUT_CSV}")
+
+
+if __name__ == "__main__":
+    main()
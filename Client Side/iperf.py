@@ -5,6 +5,10 @@ import os
 from datetime import datetime
 from pathlib import Path
 
+from iperf_parallel import parse_interval_line
+from metrics import REGISTRY, THROUGHPUT_BUCKETS_MBPS, start_http_server
+from telemetry_ring import KINDS, RingWriter
+
 # ==============================
 # iperf3 writes its own log, Python reads it live
 # ==============================
@@ -14,16 +18,51 @@ target = "192.168.0.227"
 test_duration = 9000
 interval = 1
 log_dir = "C:\\logs"
+metrics_port = 9102  # http://127.0.0.1:9102/metrics (and /metrics.json)
+
+# Live metrics for dashboards/scrapers
+REGISTRY.collector = session_name
+throughput_histogram = REGISTRY.histogram('iperf_throughput_mbps', 'Per-interval throughput in Mbits/sec',
+                                          THROUGHPUT_BUCKETS_MBPS, target=target)
+current_bps = REGISTRY.gauge('iperf_bits_per_second', 'Throughput of the latest interval', target=target)
+bytes_total = REGISTRY.counter('iperf_bytes_total', 'Bytes transferred', target=target)
+intervals_total = REGISTRY.counter('iperf_intervals_total', 'Interval reports seen', target=target)
+start_http_server(metrics_port)
+
+
+server_output = False  # set once iperf3 starts repeating the server's side of the test
+
+
+def record_metrics(line):
+    global server_output
+    # --get-server-output repeats every interval at the end; count each once
+    if 'Server output:' in line:
+        server_output = True
+    if server_output:
+        return
+    record = parse_interval_line(line, session_name)
+    if record:
+        throughput_histogram.observe(record['bits_per_second'] / 1e6)
+        current_bps.set(record['bits_per_second'])
+        bytes_total.inc(record['bytes'])
+        intervals_total.inc()
+        ring.append(KINDS['iperf_bps'], record['bits_per_second'], stream=int(record['stream']))
+
 
 Path(log_dir).mkdir(parents=True, exist_ok=True)
 
 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 log_file = os.path.join(log_dir, f"{session_name}_{timestamp}.txt")
+# Live samples for plotters/analysers in other processes
+ring_file = os.path.join(log_dir, f"{session_name}.ring")
+ring = RingWriter(ring_file)
 
 print("--------------------------------------------")
 print(f"Session: {session_name}")
 print(f"Target: {target}")
 print(f"Log File: {log_file}")
+print(f"Metrics: http://127.0.0.1:{metrics_port}/metrics")
+print(f"Telemetry Ring: {ring_file}")
 print("--------------------------------------------\n")
 
 # Start iperf3 with --logfile parameter to write its own log
@@ -48,12 +87,14 @@ try:
             line = f.readline()
             if line:
                 print(line, end='', flush=True)
+                record_metrics(line)
             else:
                 time.sleep(0.1)  # Wait a bit before checking again
         
         # Read any remaining lines after process ends
         for line in f:
             print(line, end='', flush=True)
+            record_metrics(line)
             
 except KeyboardInterrupt:
     print("\n\nStopping iperf3...")
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+import asyncio
+import csv
+import json
+import os
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+
+# ==============================
+# Several iperf3 clients at once, supervised and aggregated
+# ==============================
+
+session_name = "iperf3_parallel"
+test_duration = 9000
+interval = 1
+log_dir = "C:\\logs"
+restart_delay = 2      # seconds to wait before restarting a failed session
+max_restarts = 10      # per session, before giving up on it
+
+# One iperf3 client process per entry. An iperf3 server only runs one test
+# at a time, so every session needs its own server or its own port
+# (start them with `iperf3 -s -p <port>`).
+#   reverse  -> -R, server sends to us (downlink)
+#   bidir    -> --bidir, both directions in one session
+#   parallel -> -P, number of parallel flows in the session
+sessions = [
+    {'name': 'up',   'target': '192.168.0.227', 'port': 5201, 'reverse': False, 'bidir': False, 'parallel': 4},
+    {'name': 'down', 'target': '192.168.0.227', 'port': 5202, 'reverse': True,  'bidir': False, 'parallel': 4},
+]
+
+# Per-interval record format shared by the iperf tools in this folder; 'time'
+# is the wall-clock end of the interval (process start + 'end')
+RECORD_FIELDS = ['time', 'session', 'direction', 'stream', 'start', 'end', 'bytes', 'bits_per_second']
+
+# [  5]   0.00-1.00   sec   112 MBytes   940 Mbits/sec    0   3.01 MBytes
+# [  5][RX-C]   0.00-1.00   sec   112 MBytes   940 Mbits/sec
+INTERVAL_PATTERN = re.compile(
+    r'\[\s*(\d+|SUM)\](?:\[(TX|RX)-[CS]\])?\s+'
+    r'(\d+\.\d+)-(\d+\.\d+)\s+sec\s+'
+    r'([\d.]+)\s+([KMGT]?)Bytes\s+'
+    r'([\d.]+)\s+([KMGT]?)bits/sec(.*)$'
+)
+UNITS = {'': 1, 'K': 1e3, 'M': 1e6, 'G': 1e9, 'T': 1e12}
+BYTE_UNITS = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
+
+
+def parse_interval_line(line, session, reverse=False, now=None):
+    """Turn one iperf3 interval line into a record, or None for anything else."""
+    match = INTERVAL_PATTERN.search(line)
+    if not match:
+        return None
+    stream, tag, start, end, size, size_unit, rate, rate_unit, rest = match.groups()
+    # Skip the [SUM] lines (we aggregate ourselves) and the end-of-test totals
+    if stream == 'SUM' or 'sender' in rest or 'receiver' in rest:
+        return None
+
+    if tag:
+        direction = 'up' if tag == 'TX' else 'down'
+    else:
+        direction = 'down' if reverse else 'up'
+
+    return {
+        'time': now if now is not None else time.time(),
+        'session': session,
+        'direction': direction,
+        'stream': stream,
+        'start': float(start),
+        'end': float(end),
+        'bytes': int(float(size) * BYTE_UNITS[size_unit]),
+        'bits_per_second': float(rate) * UNITS[rate_unit],
+    }
+
+
+def jain_fairness(values):
+    """Jain's fairness index: 1.0 when all flows get the same share, 1/n at worst."""
+    total = sum(values)
+    squares = sum(v * v for v in values)
+    if not values or squares == 0:
+        return 1.0
+    return (total * total) / (len(values) * squares)
+
+
+class Aggregator:
+    """Merge per-flow interval records into one time series per direction."""
+
+    def __init__(self, flows_file, aggregate_file):
+        self.buckets = {}  # (bucket, direction) -> {flow: bits_per_second}
+        self.flushed = {}  # direction -> last bucket written out
+        self.late = 0      # records whose bucket had already been written
+        self.flows_writer = csv.DictWriter(flows_file, fieldnames=RECORD_FIELDS)
+        self.flows_writer.writeheader()
+        self.aggregate_writer = csv.writer(aggregate_file)
+        self.aggregate_writer.writerow(['time', 'direction', 'total_bps', 'flows',
+                                        'jain_fairness', 'min_flow_bps', 'max_flow_bps', 'per_flow'])
+        self.flows_file = flows_file
+        self.aggregate_file = aggregate_file
+
+    def add(self, record, started):
+        # Records from different processes are lined up on the wall clock, at
+        # the time iperf3 says the interval ended (process start + offset).
+        # The arrival time drifts across second boundaries over a long run and
+        # would put two reports of one flow in the same bucket.
+        record['time'] = started + record['end']
+        self.flows_writer.writerow(record)
+        bucket = int(record['time'] // interval) * interval
+        direction = record['direction']
+        if bucket <= self.flushed.get(direction, float('-inf')):
+            self.late += 1
+            return
+        flow = f"{record['session']}/{record['stream']}"
+        per_flow = self.buckets.setdefault((bucket, direction), {})
+        per_flow[flow] = record['bits_per_second']  # one report per flow and interval
+
+    def flush(self, older_than=None):
+        """Emit every bucket that ended before `older_than` (all of them if None)."""
+        ready = sorted(key for key in self.buckets
+                       if older_than is None or key[0] + interval <= older_than)
+        for key in ready:
+            bucket, direction = key
+            per_flow = self.buckets.pop(key)
+            self.flushed[direction] = max(bucket, self.flushed.get(direction, bucket))
+            rates = list(per_flow.values())
+            total = sum(rates)
+            fairness = jain_fairness(rates)
+            self.aggregate_writer.writerow([
+                f"{bucket:.3f}", direction, f"{total:.0f}", len(rates), f"{fairness:.4f}",
+                f"{min(rates):.0f}", f"{max(rates):.0f}",
+                json.dumps({flow: round(rate) for flow, rate in sorted(per_flow.items())}),
+            ])
+            stamp = datetime.fromtimestamp(bucket).strftime("%H:%M:%S")
+            print(f"{stamp} {direction:>4}: {total / 1e6:9.2f} Mbits/sec "
+                  f"over {len(rates):2d} flows (fairness {fairness:.3f})")
+        self.flows_file.flush()
+        self.aggregate_file.flush()
+
+
+def build_command(spec, duration):
+    cmd = ['iperf3', '-c', spec['target'], '-p', str(spec['port']),
+           '-t', str(int(duration)), '-i', str(interval), '--forceflush']
+    if spec.get('parallel', 1) > 1:
+        cmd += ['-P', str(spec['parallel'])]
+    if spec.get('bidir'):
+        cmd.append('--bidir')
+    elif spec.get('reverse'):
+        cmd.append('-R')
+    return cmd
+
+
+async def supervise(spec, aggregator, deadline):
+    """Run one iperf3 session until the deadline, restarting it if it fails."""
+    restarts = 0
+    while deadline - time.time() >= 1:  # iperf3 treats -t 0 as "default length"
+        cmd = build_command(spec, deadline - time.time())
+        started = time.time()
+        process = await asyncio.create_subprocess_exec(
+            *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT)
+        print(f"[{spec['name']}] started PID {process.pid}: {' '.join(cmd)}")
+
+        try:
+            async for raw in process.stdout:
+                line = raw.decode('utf-8', errors='ignore').rstrip()
+                record = parse_interval_line(line, spec['name'], spec.get('reverse', False))
+                if record:
+                    aggregator.add(record, started)
+                elif 'error' in line.lower():
+                    print(f"[{spec['name']}] {line}")
+            returncode = await process.wait()
+        except asyncio.CancelledError:
+            process.terminate()
+            await process.wait()
+            raise
+
+        if returncode == 0:
+            print(f"[{spec['name']}] finished")
+            return
+        restarts += 1
+        if restarts > max_restarts:
+            print(f"[{spec['name']}] failed {restarts} times, giving up")
+            return
+        print(f"[{spec['name']}] exited with code {returncode}, "
+              f"restarting in {restart_delay}s ({restarts}/{max_restarts})")
+        await asyncio.sleep(restart_delay)
+
+
+async def flush_periodically(aggregator):
+    # Give late lines one extra interval before a bucket is closed
+    while True:
+        await asyncio.sleep(interval)
+        aggregator.flush(older_than=time.time() - interval)
+
+
+async def main(flows_path, aggregate_path):
+    deadline = time.time() + test_duration
+    with open(flows_path, 'w', newline='') as flows_file, \
+            open(aggregate_path, 'w', newline='') as aggregate_file:
+        aggregator = Aggregator(flows_file, aggregate_file)
+        flusher = asyncio.create_task(flush_periodically(aggregator))
+        try:
+            await asyncio.gather(*(supervise(spec, aggregator, deadline) for spec in sessions))
+        finally:
+            flusher.cancel()
+            aggregator.flush()
+            if aggregator.late:
+                print(f"{aggregator.late} interval reports arrived after their second was written "
+                      f"(kept in the flows file only)")
+
+
+if __name__ == "__main__":
+    Path(log_dir).mkdir(parents=True, exist_ok=True)
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    flows_path = os.path.join(log_dir, f"{session_name}_{timestamp}_flows.csv")
+    aggregate_path = os.path.join(log_dir, f"{session_name}_{timestamp}_aggregate.csv")
+
+    print("--------------------------------------------")
+    print(f"Session: {session_name}")
+    for spec in sessions:
+        mode = 'bidir' if spec.get('bidir') else ('reverse' if spec.get('reverse') else 'forward')
+        print(f"  {spec['name']}: {spec['target']}:{spec['port']} {mode} x{spec.get('parallel', 1)}")
+    print(f"Flow Log: {flows_path}")
+    print(f"Aggregate Log: {aggregate_path}")
+    print("--------------------------------------------\n")
+
+    try:
+        asyncio.run(main(flows_path, aggregate_path))
+    except KeyboardInterrupt:
+        print("\n\nStopping iperf3 sessions...")
+
+    print(f"\n\nLogs saved to: {flows_path}, {aggregate_path}")
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+import bisect
+import collections
+import csv
+import os
+from datetime import datetime
+
+import numpy as np
+
+from iperf_parallel import RECORD_FIELDS, parse_interval_line
+
+# ==============================
+# Stall and throughput-collapse detection over iperf interval series
+# Reads the CSV records from iperf_parallel.py / throughput.py and the
+# --timestamps logs written by iperf.py, from the current directory.
+# ==============================
+
+stall_bps = 1000             # at or below this an interval counts as a stall
+collapse_fraction = 0.3      # below this fraction of the rolling median = collapse
+recovery_fraction = 0.9      # back to this fraction of the pre-event median = recovered
+median_window = 30           # healthy intervals in the rolling median baseline
+output_file = "iperf_stall_events.csv"
+
+# iperf3 --timestamps uses "%c", which depends on the platform locale
+TIMESTAMP_FORMATS = ['%a %b %d %H:%M:%S %Y', '%m/%d/%y %H:%M:%S', '%d/%m/%Y %H:%M:%S']
+
+
+def parse_timestamp(prefix):
+    prefix = ' '.join(prefix.split())
+    for fmt in TIMESTAMP_FORMATS:
+        try:
+            return datetime.strptime(prefix, fmt).timestamp()
+        except ValueError:
+            continue
+    return None
+
+
+def load_records(filepath):
+    """Read interval records from a CSV record file or an iperf3 text log."""
+    records = []
+    if filepath.endswith('.csv'):
+        with open(filepath, newline='') as f:
+            reader = csv.DictReader(f)
+            if reader.fieldnames != RECORD_FIELDS:
+                return records
+            for row in reader:
+                records.append((float(row['time']), f"{row['session']}/{row['direction']}/{row['stream']}",
+                                row['direction'], float(row['bits_per_second'])))
+        return records
+
+    session = os.path.splitext(os.path.basename(filepath))[0]
+    started = None  # wall clock of the iperf3 process the lines belong to
+    with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+        for line in f:
+            # --get-server-output repeats every interval at the end, untimestamped
+            if 'Server output:' in line:
+                break
+            record = parse_interval_line(line, session)
+            if not record:
+                continue
+            when = parse_timestamp(line.split('[', 1)[0])
+            if when is None:
+                continue
+            # Time each interval by its end offset from the process start, as
+            # the CSV records are; the printed timestamps drift across seconds
+            if started is None or record['start'] == 0:
+                started = when - record['end']
+            records.append((started + record['end'], f"{session}/{record['direction']}/{record['stream']}",
+                            record['direction'], record['bits_per_second']))
+    return records
+
+
+def healthy_baseline(bps, stalled):
+    """Rolling median of the last `median_window` healthy intervals before each point.
+
+    Impaired intervals never enter the window, so during an event the baseline
+    stays at its level from before the event, however long the event lasts.
+    Returns (baseline, impaired mask).
+    """
+    n = len(bps)
+    baseline = np.empty(n)
+    impaired = np.zeros(n, dtype=bool)
+    window = collections.deque()
+    ordered = []  # the window's values, sorted
+    for i, value in enumerate(bps):
+        if ordered:
+            middle = len(ordered) // 2
+            median = ordered[middle] if len(ordered) % 2 else (ordered[middle - 1] + ordered[middle]) / 2
+        else:
+            median = value
+        baseline[i] = median
+        if stalled[i] or value < collapse_fraction * median:
+            impaired[i] = True
+            continue
+        window.append(value)
+        bisect.insort(ordered, value)
+        if len(window) > median_window:
+            del ordered[bisect.bisect_left(ordered, window.popleft())]
+    return baseline, impaired
+
+
+def detect_events(times, bps):
+    """Find stall/collapse runs in one series. Returns a list of event dicts."""
+    stalled = bps <= stall_bps
+    baseline, impaired = healthy_baseline(bps, stalled)
+
+    # Run boundaries of the impaired mask
+    edges = np.diff(np.concatenate([[0], impaired.astype(np.int8), [0]]))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)  # one past the last impaired interval
+
+    n = len(bps)
+    step = float(np.median(np.diff(times))) if n > 1 else 1.0
+    # reduceat over [start, end) pairs; the padding element keeps `end == n` in range
+    bounds = np.column_stack([starts, ends]).ravel()
+    stalled_counts = np.add.reduceat(np.append(stalled, False).astype(np.int64), bounds)[::2]
+    minima = np.minimum.reduceat(np.append(bps, np.inf), bounds)[::2]
+
+    events = []
+    for start, end, stall_count, minimum in zip(starts, ends, stalled_counts, minima):
+        # Recovered: back to recovery_fraction of the baseline the event started from
+        recovered = np.flatnonzero(bps[end:] >= recovery_fraction * baseline[start])
+        recovered_at = end + recovered[0] if len(recovered) else n
+        events.append({
+            'kind': 'stall' if stall_count else 'collapse',
+            'start': times[start],
+            'end': times[end - 1] + step,
+            'duration_s': times[end - 1] + step - times[start],
+            'min_bps': float(minimum),
+            'baseline_bps': float(baseline[start]),
+            'recovery_s': float(times[recovered_at] - times[start]) if recovered_at < n else None,
+        })
+    return events
+
+
+def summarize(name, times, events):
+    span = times[-1] - times[0] if len(times) > 1 else 0.0
+    stalls = [e for e in events if e['kind'] == 'stall']
+    collapses = [e for e in events if e['kind'] == 'collapse']
+    impaired = sum(e['duration_s'] for e in events)
+    recoveries = np.array([e['recovery_s'] for e in events if e['recovery_s'] is not None])
+
+    print(f"  {name}")
+    print(f"    Intervals: {len(times)} over {span / 60:.1f} min")
+    print(f"    Stalls: {len(stalls)} ({sum(e['duration_s'] for e in stalls):.1f}s total, "
+          f"longest {max((e['duration_s'] for e in stalls), default=0):.1f}s)")
+    print(f"    Collapses: {len(collapses)} ({sum(e['duration_s'] for e in collapses):.1f}s total)")
+    if span:
+        print(f"    Impaired time: {impaired / span * 100:.2f}%")
+    if len(recoveries):
+        print(f"    Recovery: median {np.median(recoveries):.1f}s, "
+              f"p95 {np.percentile(recoveries, 95):.1f}s, max {recoveries.max():.1f}s")
+
+
+def analyse(records):
+    """Detect events per flow and per direction total. Returns (series name, event) pairs."""
+    times = np.array([r[0] for r in records])
+    flows = np.array([r[1] for r in records])
+    directions = np.array([r[2] for r in records])
+    bps = np.array([r[3] for r in records])
+
+    found = []
+    series = [(flow, flows == flow) for flow in np.unique(flows)]
+    for name, mask in series:
+        order = np.argsort(times[mask], kind='stable')
+        t, x = times[mask][order], bps[mask][order]
+        events = detect_events(t, x)
+        summarize(name, t, events)
+        found.extend((name, e) for e in events)
+
+    # Direction totals: sum the flows on whole-second buckets of interval end,
+    # as iperf_parallel.Aggregator does, keeping one value per flow and bucket
+    for direction in np.unique(directions):
+        mask = directions == direction
+        buckets, inverse = np.unique(np.floor(times[mask]), return_inverse=True)
+        _, flow_ids = np.unique(flows[mask], return_inverse=True)
+        cells = inverse * (flow_ids.max() + 1) + flow_ids
+        last = len(cells) - 1 - np.unique(cells[::-1], return_index=True)[1]
+        totals = np.bincount(inverse[last], weights=bps[mask][last], minlength=len(buckets))
+        name = f"total/{direction}"
+        events = detect_events(buckets, totals)
+        summarize(name, buckets, events)
+        found.extend((name, e) for e in events)
+    return found
+
+
+def export_events(found, filepath):
+    with open(filepath, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['series', 'kind', 'start', 'end', 'duration_s',
+                         'min_bps', 'baseline_bps', 'recovery_s'])
+        for name, e in sorted(found, key=lambda item: item[1]['start']):
+            writer.writerow([
+                name, e['kind'],
+                datetime.fromtimestamp(e['start']).isoformat(timespec='milliseconds'),
+                datetime.fromtimestamp(e['end']).isoformat(timespec='milliseconds'),
+                f"{e['duration_s']:.3f}", f"{e['min_bps']:.0f}", f"{e['baseline_bps']:.0f}",
+                '' if e['recovery_s'] is None else f"{e['recovery_s']:.3f}",
+            ])
+
+
+def scan_and_analyse():
+    """Scan current directory for iperf logs and record files and report stalls."""
+    log_files = [f for f in os.listdir('.')
+                 if (f.endswith('.csv') and f != output_file) or
+                 (f.startswith('iperf3') and f.endswith('.txt'))]
+
+    print(f"Found {len(log_files)} iperf log/record files in current directory:")
+    for filename in log_files:
+        print(f"  - {filename}")
+    print()
+
+    records = []
+    for filename in log_files:
+        try:
+            found = load_records(filename)
+            print(f"  {filename}: {len(found)} interval records")
+            records.extend(found)
+        except Exception as e:
+            print(f"  ✗ Error reading {filename}: {e}")
+
+    if not records:
+        print("\n" + "="*50)
+        print("NO DATA FOUND!")
+        print("="*50)
+        return
+
+    print(f"\n{'='*50}")
+    print("Stall / collapse summary:")
+    found = analyse(records)
+    export_events(found, output_file)
+    print(f"\n  Events detected: {len(found)}")
+    print(f"  Events saved to: {output_file}")
+    print(f"{'='*50}")
+
+
+if __name__ == "__main__":
+    scan_and_analyse()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+import bisect
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ==============================
+# In-process metrics for the collectors, served on a local HTTP endpoint
+#   /metrics       Prometheus text format
+#   /metrics.json  JSON (with rolling quantiles) for local dashboards
+#
+# Updates are plain attribute/list increments with no locking: every metric
+# is written by a single collector thread, and a scrape that races an update
+# is at most one sample behind.
+# ==============================
+
+RTT_BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000]
+THROUGHPUT_BUCKETS_MBPS = [1, 5, 10, 50, 100, 200, 500, 1000, 2000, 5000]
+
+
+def _format_labels(labels, extra=None):
+    items = dict(labels)
+    if extra:
+        items.update(extra)
+    if not items:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in items.items()) + '}'
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labels):
+        self.name, self.help, self.labels = name, help_text, labels
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def prometheus(self):
+        return [f"{self.name}{_format_labels(self.labels)} {self.value}"]
+
+    def snapshot(self):
+        return self.value
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def set(self, value):
+        self.value = value
+
+
+class RollingHistogram:
+    """Cumulative bucket counts plus a rolling window for live quantiles.
+
+    The window is split into slices; each observation lands in the current
+    slice and whole slices age out, so observe() is a bisect and two increments.
+    """
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labels, buckets, window=60, slices=6):
+        self.name, self.help, self.labels = name, help_text, labels
+        self.bounds = list(buckets)
+        self.counts = [0] * (len(self.bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.slice_seconds = window / slices
+        self.slices = [[0] * (len(self.bounds) + 1) for _ in range(slices)]
+        self.slice_index = int(time.monotonic() // self.slice_seconds)
+
+    def _current_slice(self):
+        index = int(time.monotonic() // self.slice_seconds)
+        if index != self.slice_index:
+            # Clear every slice we skipped over since the last observation
+            for skipped in range(self.slice_index + 1, min(index, self.slice_index + len(self.slices)) + 1):
+                row = self.slices[skipped % len(self.slices)]
+                row[:] = [0] * len(row)
+            self.slice_index = index
+        return self.slices[index % len(self.slices)]
+
+    def observe(self, value):
+        slot = bisect.bisect_left(self.bounds, value)
+        self.counts[slot] += 1
+        self._current_slice()[slot] += 1
+        self.sum += value
+        self.count += 1
+
+    def rolling_quantile(self, q):
+        """Approximate quantile over the rolling window (upper bucket bound)."""
+        self._current_slice()
+        window = [sum(column) for column in zip(*self.slices)]
+        total = sum(window)
+        if not total:
+            return None
+        rank = q * total
+        running = 0
+        for bound, count in zip(self.bounds + [float('inf')], window):
+            running += count
+            if running >= rank:
+                return bound
+        return float('inf')
+
+    def prometheus(self):
+        lines = []
+        running = 0
+        for bound, count in zip(self.bounds, self.counts):
+            running += count
+            lines.append(f"{self.name}_bucket{_format_labels(self.labels, {'le': bound})} {running}")
+        lines.append(f"{self.name}_bucket{_format_labels(self.labels, {'le': '+Inf'})} {self.count}")
+        lines.append(f"{self.name}_sum{_format_labels(self.labels)} {self.sum}")
+        lines.append(f"{self.name}_count{_format_labels(self.labels)} {self.count}")
+        return lines
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'buckets': dict(zip([str(b) for b in self.bounds] + ['+Inf'], self.counts)),
+            'rolling': {f'p{int(q * 100)}': self.rolling_quantile(q) for q in (0.5, 0.9, 0.99)},
+        }
+
+
+class Registry:
+    def __init__(self, collector='collector'):
+        self.collector = collector
+        self.metrics = {}
+
+    def _add(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help_text, **labels):
+        return self._add(Counter(name, help_text, labels))
+
+    def gauge(self, name, help_text, **labels):
+        return self._add(Gauge(name, help_text, labels))
+
+    def histogram(self, name, help_text, buckets, **labels):
+        return self._add(RollingHistogram(name, help_text, labels, buckets))
+
+    def prometheus(self):
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.prometheus())
+        return '\n'.join(lines) + '\n'
+
+    def snapshot(self):
+        return {
+            'collector': self.collector,
+            'time': time.time(),
+            'metrics': {name: metric.snapshot() for name, metric in list(self.metrics.items())},
+        }
+
+
+REGISTRY = Registry()
+
+
+def start_http_server(port, registry=REGISTRY, host='127.0.0.1'):
+    """Serve the registry in a background thread. Returns the server."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.startswith('/metrics.json'):
+                body = json.dumps(registry.snapshot()).encode()
+                content_type = 'application/json'
+            elif self.path.startswith('/metrics'):
+                body = registry.prometheus().encode()
+                content_type = 'text/plain; version=0.0.4'
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            # Lets a local dashboard page poll several collectors directly
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # keep scrapes out of the collector's console output
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -3,8 +3,12 @@ import subprocess
 import sys
 from datetime import datetime
 import os
+import re
 from pathlib import Path
 
+from metrics import REGISTRY, RTT_BUCKETS_MS, start_http_server
+from telemetry_ring import KINDS, RingWriter
+
 # ==============================
 # Auto-logging continuous ping with timestamps
 # ==============================
@@ -12,18 +16,33 @@ session_name = "ping"
 target = "192.168.0.227"
 timeout_ms = 1000
 log_dir = "C:\\logs"
+metrics_port = 9101  # http://127.0.0.1:9101/metrics (and /metrics.json)
+
+# Live metrics for dashboards/scrapers
+REGISTRY.collector = session_name
+rtt_histogram = REGISTRY.histogram('ping_rtt_ms', 'Ping round-trip time in ms', RTT_BUCKETS_MS, target=target)
+last_rtt = REGISTRY.gauge('ping_last_rtt_ms', 'Most recent ping round-trip time in ms', target=target)
+replies = REGISTRY.counter('ping_replies_total', 'Echo replies received', target=target)
+timeouts = REGISTRY.counter('ping_timeouts_total', 'Requests that timed out or were unreachable', target=target)
+rtt_pattern = re.compile(r'time[=<]\s*([\d.]+)\s*ms')
+start_http_server(metrics_port)
 
 # Create log directory if it doesn't exist
 Path(log_dir).mkdir(parents=True, exist_ok=True)
 
 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 log_file = os.path.join(log_dir, f"{session_name}_{timestamp}.txt")
+# Live samples for plotters/analysers in other processes
+ring_file = os.path.join(log_dir, f"{session_name}.ring")
+ring = RingWriter(ring_file)
 
 print("--------------------------------------------")
 print(f"Session: {session_name}")
 print(f"Target: {target}")
 print(f"Timeout: {timeout_ms}ms")
 print(f"Log File: {log_file}")
+print(f"Metrics: http://127.0.0.1:{metrics_port}/metrics")
+print(f"Telemetry Ring: {ring_file}")
 print("--------------------------------------------\n")
 print("Ping started. Press Ctrl+C to stop.\n")
 
@@ -56,6 +75,18 @@ with open(log_file, 'w', buffering=1) as f:
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             output = line.decode('utf-8', errors='ignore').rstrip()
             logged_line = f"{timestamp} {output}"
+
+            rtt_match = rtt_pattern.search(output)
+            if rtt_match:
+                rtt = float(rtt_match.group(1))
+                rtt_histogram.observe(rtt)
+                last_rtt.set(rtt)
+                replies.inc()
+                ring.append(KINDS['ping_rtt_ms'], rtt)
+            elif 'timed out' in output or 'unreachable' in output.lower():
+                timeouts.inc()
+                ring.append(KINDS['ping_timeout'], 1)
+
             print(logged_line)
             f.write(logged_line + '\n')
             sys.stdout.flush()
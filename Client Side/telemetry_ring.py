@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+import mmap
+import os
+import struct
+import sys
+import time
+
+# ==============================
+# Fixed-record ring buffer in a memory-mapped file
+#
+# One collector process appends samples; any number of readers (plotters,
+# stats, the metrics exporter) map the same file and follow the write
+# sequence number. The writer never waits for readers: a reader that falls
+# more than `capacity` samples behind skips ahead and counts what it lost.
+#
+#   python telemetry_ring.py C:\logs\ping.ring    -> follow a ring live
+# ==============================
+
+MAGIC = b'TRING001'
+# magic, record size, capacity, generation, write sequence
+HEADER = struct.Struct('<8sIIQQ')
+HEADER_SIZE = 64
+SEQ_OFFSET = 24  # write sequence inside the header
+# slot sequence (seq + 1, 0 while being written), time, source, kind, stream, value
+SAMPLE = struct.Struct('<QdHHid')
+SLOT_SEQ = struct.Struct('<Q')
+DEFAULT_CAPACITY = 65536
+
+# Sample kinds written by the collectors in this folder
+KINDS = {
+    'ping_rtt_ms': 1,
+    'ping_timeout': 2,
+    'iperf_bps': 3,
+}
+KIND_NAMES = {v: k for k, v in KINDS.items()}
+
+
+class RingWriter:
+    """Single writer. append() is one struct.pack_into plus two 8-byte stores."""
+
+    def __init__(self, path, capacity=DEFAULT_CAPACITY, source=0):
+        self.capacity = capacity
+        self.source = source
+        size = HEADER_SIZE + capacity * SAMPLE.size
+        if os.path.exists(path) and os.path.getsize(path) == size:
+            # Reuse the ring of an earlier run in place: truncating a file that
+            # followers still have mapped fails on Windows and gets them SIGBUS
+            # elsewhere. The generation bump below is what resets them.
+            with open(path, 'r+b') as f:
+                self.map = mmap.mmap(f.fileno(), size)
+        else:
+            with open(path, 'w+b') as f:
+                f.truncate(size)
+                self.map = mmap.mmap(f.fileno(), size)
+        self.seq = 0
+        # Sequence first, so a reader still on the old generation sees nothing
+        # new; then a new generation tells readers of an older run to start over
+        SLOT_SEQ.pack_into(self.map, SEQ_OFFSET, 0)
+        HEADER.pack_into(self.map, 0, MAGIC, SAMPLE.size, capacity, time.time_ns(), 0)
+
+    def append(self, kind, value, stream=0, when=None):
+        seq = self.seq
+        offset = HEADER_SIZE + (seq % self.capacity) * SAMPLE.size
+        # Mark the slot as in-progress, fill it, then publish slot and header sequence
+        SLOT_SEQ.pack_into(self.map, offset, 0)
+        SAMPLE.pack_into(self.map, offset, 0, time.time() if when is None else when,
+                         self.source, kind, stream, value)
+        SLOT_SEQ.pack_into(self.map, offset, seq + 1)
+        self.seq = seq + 1
+        SLOT_SEQ.pack_into(self.map, SEQ_OFFSET, self.seq)
+
+    def close(self):
+        self.map.close()
+
+
+class RingReader:
+    """Follows a ring from any process. Samples are unpacked straight from the map."""
+
+    def __init__(self, path, from_start=False):
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, record_size, self.capacity, self.generation, write_seq = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or record_size != SAMPLE.size:
+            raise ValueError(f"{path} is not a telemetry ring")
+        self.next_seq = max(0, write_seq - self.capacity) if from_start else write_seq
+        self.lost = 0
+
+    def lag(self):
+        """How many samples the writer is ahead of this reader."""
+        return SLOT_SEQ.unpack_from(self.map, SEQ_OFFSET)[0] - self.next_seq
+
+    def poll(self, limit=None):
+        """Return the (seq, time, source, kind, stream, value) samples written since the last poll."""
+        generation = HEADER.unpack_from(self.map, 0)[3]
+        if generation != self.generation:
+            # The writer restarted and reset its sequence
+            self.generation = generation
+            self.next_seq = 0
+        write_seq = SLOT_SEQ.unpack_from(self.map, SEQ_OFFSET)[0]
+        oldest = write_seq - self.capacity
+        if self.next_seq < oldest:
+            self.lost += oldest - self.next_seq
+            self.next_seq = oldest
+        if limit is not None:
+            write_seq = min(write_seq, self.next_seq + limit)
+
+        samples = []
+        unpack_from, slot_seq = SAMPLE.unpack_from, SLOT_SEQ.unpack_from
+        for seq in range(self.next_seq, write_seq):
+            offset = HEADER_SIZE + (seq % self.capacity) * SAMPLE.size
+            sample = unpack_from(self.map, offset)
+            # The writer lapped us while we were copying: count it as lost
+            if sample[0] != seq + 1 or slot_seq(self.map, offset)[0] != seq + 1:
+                self.lost += 1
+                continue
+            samples.append((seq,) + sample[1:])
+        self.next_seq = write_seq
+        return samples
+
+    def close(self):
+        self.map.close()
+
+
+def follow(path, poll_interval=0.2):
+    """Print samples from a ring as they arrive."""
+    reader = RingReader(path)
+    print(f"Following {path} (capacity {reader.capacity} samples). Press Ctrl+C to stop.\n")
+    reported_lost = 0
+    try:
+        while True:
+            for seq, when, source, kind, stream, value in reader.poll():
+                stamp = time.strftime('%H:%M:%S', time.localtime(when))
+                print(f"{stamp} #{seq} source={source} {KIND_NAMES.get(kind, kind)}[{stream}] = {value:g}")
+            if reader.lost != reported_lost:
+                print(f"  ⚠ reader fell behind, {reader.lost - reported_lost} samples lost")
+                reported_lost = reader.lost
+            time.sleep(poll_interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        reader.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or not os.path.exists(sys.argv[1]):
+        print("Usage: python telemetry_ring.py <ring file>")
+        sys.exit(1)
+    follow(sys.argv[1])
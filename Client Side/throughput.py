@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+import csv
+import multiprocessing
+import os
+import socket
+import struct
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from iperf_parallel import RECORD_FIELDS
+
+# ==============================
+# Pure-Python throughput tester for machines without iperf3
+#   python throughput.py server
+#   python throughput.py client
+# ==============================
+
+session_name = "throughput"
+mode = sys.argv[1] if len(sys.argv) > 1 else "client"
+target = "192.168.0.227"
+port = 5301
+protocol = "tcp"            # "tcp" or "udp"
+streams = 4                 # parallel connections / datagram senders
+test_duration = 30
+interval = 1
+min_final_interval = 0.5    # a last partial interval shorter than this fraction of interval is dropped
+block_size = 128 * 1024     # bytes per send() for TCP
+datagram_size = 1400        # bytes per datagram for UDP (use up to 65000 on loopback)
+udp_rate = 100_000_000      # bits/sec per stream for UDP, 0 = as fast as possible
+socket_buffer = 4 * 1024 * 1024
+use_sendfile = False        # TCP: let the kernel send straight from a file (os.sendfile)
+use_processes = False       # run client streams in processes instead of threads
+log_dir = "C:\\logs"
+
+# Every UDP datagram starts with (stream id, sequence number) so the server can count loss
+UDP_HEADER = struct.Struct('!IQ')
+SENDFILE_SIZE = 8 * 1024 * 1024
+
+
+def tune_socket(sock):
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, socket_buffer)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, socket_buffer)
+
+
+# ------------------------------
+# Interval reporting
+# ------------------------------
+
+class Reporter(threading.Thread):
+    """Turn per-stream byte counters into iperf-style interval records."""
+
+    def __init__(self, counters, session, writer=None, losses=None):
+        super().__init__(daemon=True)
+        self.counters = counters    # indexable, one running byte total per stream
+        self.losses = losses        # optional running lost-datagram totals (UDP server)
+        self.session = session
+        self.writer = writer
+        self.stop_event = threading.Event()
+        self.totals = []
+
+    def run(self):
+        started = time.time()
+        last = [0] * len(self.counters)
+        last_lost = [0] * len(self.counters)
+        tick = 0
+        while not self.stop_event.is_set():
+            tick += 1
+            # Sleep to the next interval boundary so intervals don't drift
+            self.stop_event.wait(max(0.0, started + tick * interval - time.time()))
+            now = time.time()
+            start = (tick - 1) * interval
+            end = min(now - started, tick * interval)
+            # stop() cuts the last interval short; its rate over a few
+            # milliseconds would be a meaningless spike in the log
+            if self.stop_event.is_set() and end - start < min_final_interval * interval:
+                break
+
+            count = len(self.counters)
+            last += [0] * (count - len(last))
+            last_lost += [0] * (count - len(last_lost))
+            total_bits = 0.0
+            lost = 0
+            for stream in range(count):
+                current = self.counters[stream]
+                delta = current - last[stream]
+                last[stream] = current
+                if self.losses is not None:
+                    lost += self.losses[stream] - last_lost[stream]
+                    last_lost[stream] = self.losses[stream]
+                bps = delta * 8 / max(end - start, 1e-9)
+                total_bits += bps
+                record = {
+                    'time': started + end,
+                    'session': self.session,
+                    'direction': 'up',
+                    'stream': str(stream),
+                    'start': round(start, 2),
+                    'end': round(end, 2),
+                    'bytes': delta,
+                    'bits_per_second': bps,
+                }
+                if self.writer:
+                    self.writer.writerow(record)
+            self.totals.append(total_bits)
+            loss_note = f"  lost {lost}" if self.losses is not None else ""
+            print(f"[SUM] {start:6.2f}-{end:6.2f} sec  {total_bits / 1e9:7.3f} Gbits/sec "
+                  f"over {count} streams{loss_note}", flush=True)
+
+    def stop(self):
+        self.stop_event.set()
+        self.join()
+
+
+# ------------------------------
+# Client side
+# ------------------------------
+
+def tcp_sender(stream, counters, deadline):
+    sock = socket.create_connection((target, port))
+    tune_socket(sock)
+    payload = memoryview(bytearray(block_size))
+    try:
+        if use_sendfile and hasattr(os, 'sendfile'):
+            # The kernel copies from the page cache straight into the socket
+            with tempfile.TemporaryFile() as f:
+                f.write(bytes(SENDFILE_SIZE))
+                f.flush()
+                fd, out = f.fileno(), sock.fileno()
+                while time.time() < deadline:
+                    counters[stream] += os.sendfile(out, fd, 0, SENDFILE_SIZE)
+        else:
+            while time.time() < deadline:
+                # sendall() on a memoryview sends the same buffer every time without copying
+                sock.sendall(payload)
+                counters[stream] += block_size
+    except (BrokenPipeError, ConnectionResetError):
+        pass
+    finally:
+        sock.close()
+
+
+def udp_sender(stream, counters, deadline):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    tune_socket(sock)
+    sock.connect((target, port))
+    buffer = bytearray(datagram_size)
+    payload = memoryview(buffer)
+    per_second = udp_rate / 8 / datagram_size if udp_rate else 0
+    started = time.time()
+    seq = 0
+    while True:
+        now = time.time()
+        if now >= deadline:
+            break
+        if per_second and seq > (now - started) * per_second:
+            # Ahead of the requested rate: wait roughly until the next datagram is due
+            time.sleep(min(0.001, (seq / per_second) - (now - started)))
+            continue
+        # Send a small burst between clock reads to keep per-datagram overhead low
+        for _ in range(64):
+            UDP_HEADER.pack_into(buffer, 0, stream, seq)
+            try:
+                sock.send(payload)
+            except (BlockingIOError, ConnectionRefusedError):
+                continue
+            seq += 1
+            counters[stream] += datagram_size
+    sock.close()
+
+
+def run_client(log_file):
+    deadline = time.time() + test_duration
+    sender = tcp_sender if protocol == 'tcp' else udp_sender
+    # Shared memory counters work for both threads and processes
+    counters = multiprocessing.RawArray('Q', streams)
+
+    with open(log_file, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=RECORD_FIELDS)
+        writer.writeheader()
+        reporter = Reporter(counters, f"{protocol}-client", writer)
+
+        worker_type = multiprocessing.Process if use_processes else threading.Thread
+        workers = [worker_type(target=sender, args=(i, counters, deadline), daemon=True)
+                   for i in range(streams)]
+        reporter.start()
+        for worker in workers:
+            worker.start()
+        try:
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            print("\n\nStopping client...")
+            for worker in workers:
+                if use_processes:
+                    worker.terminate()
+        reporter.stop()
+
+    total = sum(counters)
+    print(f"\nSent {total / 1e9:.3f} GB, average {total * 8 / test_duration / 1e9:.3f} Gbits/sec")
+    return reporter.totals
+
+
+# ------------------------------
+# Server side
+# ------------------------------
+
+def tcp_receiver(conn, stream, counters):
+    tune_socket(conn)
+    buffer = bytearray(block_size)
+    view = memoryview(buffer)
+    with conn:
+        while True:
+            # recv_into() reuses the same buffer instead of allocating per read
+            received = conn.recv_into(view)
+            if not received:
+                break
+            counters[stream] += received
+
+
+def run_tcp_server(counters):
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    tune_socket(listener)
+    listener.bind(('', port))
+    listener.listen(64)
+    while True:
+        conn, addr = listener.accept()
+        stream = len(counters)
+        counters.append(0)
+        print(f"Stream {stream} connected from {addr[0]}:{addr[1]}", flush=True)
+        threading.Thread(target=tcp_receiver, args=(conn, stream, counters), daemon=True).start()
+
+
+def run_udp_server(counters, losses):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    tune_socket(sock)
+    sock.bind(('', port))
+    buffer = bytearray(65536)
+    view = memoryview(buffer)
+    expected = {}
+    while True:
+        received = sock.recv_into(view)
+        if received < UDP_HEADER.size:
+            continue
+        stream, seq = UDP_HEADER.unpack_from(buffer, 0)
+        while len(counters) <= stream:
+            counters.append(0)
+            losses.append(0)
+        counters[stream] += received
+        next_seq = expected.get(stream, 0)
+        if seq > next_seq:
+            losses[stream] += seq - next_seq
+        if seq >= next_seq:
+            expected[stream] = seq + 1
+
+
+def run_server(log_file):
+    counters = []
+    losses = [] if protocol == 'udp' else None
+    with open(log_file, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=RECORD_FIELDS)
+        writer.writeheader()
+        reporter = Reporter(counters, f"{protocol}-server", writer, losses)
+        reporter.start()
+        try:
+            if protocol == 'tcp':
+                run_tcp_server(counters)
+            else:
+                run_udp_server(counters, losses)
+        except KeyboardInterrupt:
+            print("\n\nStopping server...")
+        reporter.stop()
+
+
+if __name__ == "__main__":
+    Path(log_dir).mkdir(parents=True, exist_ok=True)
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    log_file = os.path.join(log_dir, f"{session_name}_{mode}_{timestamp}.csv")
+
+    print("--------------------------------------------")
+    print(f"Session: {session_name} ({mode}, {protocol.upper()})")
+    if mode == 'client':
+        print(f"Target: {target}:{port}")
+        print(f"Streams: {streams} ({'processes' if use_processes else 'threads'})")
+    else:
+        print(f"Listening on port {port}")
+    print(f"Log File: {log_file}")
+    print("--------------------------------------------\n")
+
+    if mode == 'server':
+        run_server(log_file)
+    else:
+        run_client(log_file)
+
+    print(f"\nLog saved to: {log_file}")
@@ -1,308 +1,287 @@
-
 import socket
-import struct
-import random
 import time
 
+from dhcp_log import DEBUG, DHCPLogger
+from dhcp_metrics import DHCPMetrics, start_http_server
+from dhcp_packet import DHCPPacket
+from lease_journal import LeaseJournal
+from pools import int_to_ip
+from response_cache import ResponseCache
+from scopes import Scope, ScopeTable
+
+MESSAGE_TYPES = {1: 'Discover', 2: 'Offer', 3: 'Request', 4: 'Decline', 5: 'ACK', 6: 'NAK', 7: 'Release', 8: 'Inform'}
+
+# Static MAC to IP mappings (reservations) for the default 192.168.0.0/24 subnet
+RESERVATIONS = {
+    '42:79:99:bb:69:6f': '192.168.0.33',
+}
+
 class DHCPServer:
-    def __init__(self, server_ip='192.168.0.1', subnet='192.168.0.0/24', lease_duration=86400):
+    def __init__(self, server_ip='192.168.0.1', subnet='192.168.0.0/24', lease_duration=86400,
+                 pool_ranges=(('192.168.0.100', '192.168.0.200'),), exclusions=(),
+                 router=None, dns_server='8.8.8.8', extra_options=None, journal_path=None,
+                 log_level=DEBUG, bind_address='', port=67, client_port=68, reply_address='255.255.255.255',
+                 metrics_port=None, scopes=(), reservations=None):
         self.server_ip = server_ip
-        self.subnet = subnet
-        self.lease_duration = lease_duration
-        self.ip_pool = self._generate_ip_pool()
-        self.leased_ips = {}
         
-        # Static MAC to IP mappings (reservations)
-        self.static_mappings = {
-            (0x42, 0x79, 0x99, 0xbb, 0x69, 0x6f): '192.168.0.33',  # 42:79:99:bb:69:6f
-        }
+        # Where we listen and where replies go; the defaults are the standard
+        # DHCP ports, anything else allows unprivileged runs (e.g. dhcp_bench.py)
+        self.bind_address = bind_address
+        self.port = port
+        self.client_port = client_port
+        self.reply_address = reply_address
         
-        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        self.server_socket.bind(('', 67))
-
-    def _generate_ip_pool(self):
-        # Generate IP pool for 192.168.0.100 to 192.168.0.200
-        return [f'192.168.0.{i}' for i in range(100, 201)]
-
-    def _parse_dhcp_packet(self, data):
-        # Parse DHCP packet
-        op = data[0]
-        htype = data[1]
-        hlen = data[2]
-        hops = data[3]
-        xid = data[4:8]
-        secs = struct.unpack('!H', data[8:10])[0]
-        flags = struct.unpack('!H', data[10:12])[0]
-        ciaddr = data[12:16]
-        yiaddr = data[16:20]
-        siaddr = data[20:24]
-        giaddr = data[24:28]
-        chaddr = data[28:44]  # Full 16 bytes for chaddr
-        sname = data[44:108]
-        file = data[108:236]
+        # The directly attached subnet, with `reservations` ({mac: ip}) as its
+        # static mappings, plus one scope per relayed subnet (dicts of Scope
+        # arguments; server_ip, lease_duration and dns_server default to ours,
+        # router is required - the relay's address on that subnet). Requests
+        # pick theirs by giaddr, see _select_scope
+        self.default_scope = Scope(subnet, subnet, server_ip, lease_duration, pool_ranges, exclusions,
+                                   router, dns_server, reservations, extra_options)
+        self.scopes = ScopeTable([self.default_scope])
+        for config in scopes:
+            self.scopes.add(Scope(**{'server_ip': server_ip, 'lease_duration': lease_duration,
+                                     'dns_server': dns_server, **config}))
+        self.response_cache = ResponseCache()
+        self.reload_templates()
         
-        # Check for DHCP magic cookie
-        if len(data) > 236 and data[236:240] == bytes([99, 130, 83, 99]):
-            options = data[240:]
-        else:
-            options = b''
+        # Structured JSONL events, formatted and written by a background thread
+        self.log = DHCPLogger(level=log_level)
+        self.server_socket = None
         
-        # Parse DHCP options
-        dhcp_message_type = None
-        requested_ip = None
-        hostname = None
-        i = 0
-        while i < len(options):
-            if i >= len(options):
-                break
-            opt_code = options[i]
-            if opt_code == 255:  # End option
-                break
-            if opt_code == 0:  # Pad option
-                i += 1
-                continue
-            if i + 1 >= len(options):
-                break
-            opt_len = options[i + 1]
-            if i + 2 + opt_len > len(options):
-                break
-            if opt_code == 53:  # DHCP Message Type
-                dhcp_message_type = options[i + 2]
-            elif opt_code == 50:  # Requested IP Address
-                requested_ip = socket.inet_ntoa(options[i + 2:i + 2 + opt_len])
-            elif opt_code == 12:  # Host Name
-                hostname = options[i + 2:i + 2 + opt_len].decode('ascii', errors='ignore')
-            i += 2 + opt_len
+        # Counters and histograms for /metrics; pool figures are read at scrape time
+        self.metrics = DHCPMetrics()
+        for scope in self.scopes:
+            self.metrics.add_scope(scope.name, scope.pool, scope.leases)
+        self.metrics.add_gauge('dhcp_leases', 'Leases and held offers in the table',
+                               lambda: sum(len(scope.leases) for scope in self.scopes))
+        self.metrics.add_gauge('dhcp_response_cache_entries', 'Replies kept for retransmissions',
+                               lambda: len(self.response_cache.entries))
+        if metrics_port:
+            start_http_server(metrics_port, self.metrics)
         
-        return {
-            'op': op,
-            'htype': htype,
-            'hlen': hlen,
-            'hops': hops,
-            'xid': xid,
-            'secs': secs,
-            'flags': flags,
-            'ciaddr': socket.inet_ntoa(ciaddr),
-            'yiaddr': socket.inet_ntoa(yiaddr),
-            'siaddr': socket.inet_ntoa(siaddr),
-            'giaddr': socket.inet_ntoa(giaddr),
-            'chaddr': chaddr,
-            'sname': sname,
-            'file': file,
-            'message_type': dhcp_message_type,
-            'requested_ip': requested_ip,
-            'hostname': hostname
-        }
+        # Grants and releases are journaled so a restart keeps every lease
+        self.journal = None
+        if journal_path:
+            self.journal = LeaseJournal(journal_path, partition=self.scopes.partition)
+            restored = self.journal.load(self.scopes)
+            self.log.info('leases_restored', count=restored, path=journal_path)
+
+    def _create_socket(self, reuse_port=False):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reuse_port:
+            # Several worker processes bound to the same port (dhcp_workers.py)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind((self.bind_address, self.port))
+        return sock
+
+    @property
+    def ip_pool(self):
+        return self.default_scope.pool
+
+    @property
+    def leases(self):
+        return self.default_scope.leases
+
+    def _parse_dhcp_packet(self, data):
+        # Lazy view over the datagram; None for anything that isn't a DHCP request
+        return DHCPPacket.parse(data)
 
     def _log_dhcp_request(self, packet, addr):
         # Log detailed debug information about DHCP request
-        print("\n=== DHCP Request Received ===")
-        print(f"Source Address: {addr[0]}:{addr[1]}")
-        print(f"Operation: {packet['op']} ({'BOOTREQUEST' if packet['op'] == 1 else 'BOOTREPLY'})")
-        print(f"Transaction ID: {packet['xid'].hex()}")
-        mac_bytes = packet['chaddr'][:6]
-        print(f"Client MAC: {':'.join([f'{b:02x}' for b in mac_bytes])}")
-        msg_types = {1: 'Discover', 2: 'Offer', 3: 'Request', 4: 'Decline', 5: 'ACK', 6: 'NAK', 7: 'Release', 8: 'Inform'}
-        print(f"Message Type: {packet['message_type']} ({msg_types.get(packet['message_type'], 'Unknown')})")
-        print(f"Client IP: {packet['ciaddr']}")
-        print(f"Your IP: {packet['yiaddr']}")
-        print(f"Server IP: {packet['siaddr']}")
-        print(f"Gateway IP: {packet['giaddr']}")
-        print(f"Seconds Elapsed: {packet['secs']}")
-        print(f"Flags: {packet['flags']:04x} ({'Broadcast' if packet['flags'] & 0x8000 else 'Unicast'})")
-        if packet['requested_ip']:
-            print(f"Requested IP: {packet['requested_ip']}")
-        if packet['hostname']:
-            print(f"Client Hostname: {packet['hostname']}")
-        print("========================\n")
+        if not self.log.enabled(DEBUG):
+            return
+        self.log.debug('request', packet.mac, src=f"{addr[0]}:{addr[1]}", op=packet.op, xid=f"{packet.xid:08x}",
+                       message_type=MESSAGE_TYPES.get(packet.message_type, packet.message_type),
+                       ciaddr=packet.ciaddr, yiaddr=packet.yiaddr, siaddr=packet.siaddr, giaddr=packet.giaddr,
+                       secs=packet.secs, broadcast=bool(packet.flags & 0x8000),
+                       requested_ip=packet.requested_ip, hostname=packet.hostname)
+
+    def reload_templates(self):
+        """(Re)encode the constant parts of every reply; call after changing the configuration."""
+        # Stored replies were encoded with the old configuration
+        self.response_cache.clear()
+        for scope in self.scopes:
+            scope.build_responses()
 
-    def _create_dhcp_packet(self, packet, message_type, offered_ip):
+    def _create_dhcp_packet(self, packet, message_type, offered_ip, scope):
         """Create a properly formatted DHCP response packet"""
-        # Create packet with proper size (minimum 300 bytes for DHCP)
-        response = bytearray(576)  # Standard DHCP packet size
+        # Template copy plus the per-client fields (see ResponseBuilder);
+        # giaddr is echoed so the relay knows where to forward the reply
+        return scope.responses.build(packet, message_type, offered_ip, packet.giaddr)
+
+    def _create_dhcp_offer(self, packet, offered_ip, scope):
+        self.metrics.outcomes['offer'] += 1
+        self.log.info('offer', packet.mac, ip=offered_ip, scope=scope.name)
+        return self._create_dhcp_packet(packet, 2, offered_ip, scope)  # Message type 2 = OFFER
+
+    def _create_dhcp_ack(self, packet, assigned_ip, scope):
+        self.metrics.outcomes['ack'] += 1
+        self.log.info('ack', packet.mac, ip=assigned_ip, scope=scope.name)
+        return self._create_dhcp_packet(packet, 5, assigned_ip, scope)  # Message type 5 = ACK
+
+    def _get_broadcast_address(self, packet):
+        """Determine broadcast address based on flags"""
+        # Relayed request: unicast to the relay agent, which forwards it on
+        if packet.giaddr:
+            return (int_to_ip(packet.giaddr), self.port)
+        # If broadcast flag is set or ciaddr is 0.0.0.0, use broadcast
+        if packet.flags & 0x8000 or packet.ciaddr == 0:
+            return (self.reply_address, self.client_port)
+        else:
+            # Could use ciaddr for unicast, but broadcast is safer
+            return (self.reply_address, self.client_port)
+
+    def _select_scope(self, packet, local_ip=None):
+        """Scope for a request: by relay address, else by receiving address, else the attached subnet."""
+        if packet.giaddr:
+            return self.scopes.for_address(packet.giaddr)
+        if local_ip:
+            return self.scopes.for_address(local_ip) or self.default_scope
+        return self.default_scope
+
+    def _print_banner(self):
+        print(f"DHCP Server running on {self.server_ip}...")
+        print(f"Listening on {self.bind_address or '*'}:{self.port}, replying to {self.reply_address}:{self.client_port}")
         
-        # BOOTP header
-        response[0] = 2  # op: BOOTREPLY
-        response[1] = packet['htype']  # htype: same as request
-        response[2] = packet['hlen']  # hlen: same as request
-        response[3] = 0  # hops
-        response[4:8] = packet['xid']  # xid: must match request
-        response[8:10] = struct.pack('!H', 0)  # secs
-        response[10:12] = struct.pack('!H', packet['flags'])  # flags: copy from request
-        response[12:16] = socket.inet_aton('0.0.0.0')  # ciaddr
-        response[16:20] = socket.inet_aton(offered_ip)  # yiaddr: offered IP
-        response[20:24] = socket.inet_aton(self.server_ip)  # siaddr: server IP
-        response[24:28] = socket.inet_aton('0.0.0.0')  # giaddr
-        response[28:44] = packet['chaddr']  # chaddr: client hardware address (16 bytes)
-        response[44:108] = packet['sname']  # sname: server host name (64 bytes)
-        response[108:236] = packet['file']  # file: boot file name (128 bytes)
+        for scope in self.scopes:
+            relayed = '' if scope is self.default_scope else ' (relayed)'
+            print(f"\nScope {scope.name}{relayed}: {scope.pool.subnet}, router {scope.router}")
+            print(f"IP Pool: {scope.pool.describe()} ({len(scope.pool)} addresses)")
+            print(f"Lease Duration: {scope.lease_duration} seconds")
+            
+            # Display static mappings
+            if scope.static_mappings:
+                print("📌 Static MAC-to-IP Reservations:")
+                for mac, ip in scope.static_mappings.items():
+                    print(f"  {mac.hex(':')} -> {int_to_ip(ip)}")
+        print()
+
+    def handle_packet(self, data, addr, now=None, local_ip=None):
+        """Decide on one datagram. Returns the (response, destination) pairs to send.
+
+        `local_ip` (an int) is the address the datagram arrived on, when the
+        front end knows it; it picks the scope of requests that weren't relayed.
+        """
+        packet = self._parse_dhcp_packet(data)
         
-        # Magic cookie
-        response[236:240] = bytes([99, 130, 83, 99])
+        if packet is None:
+            self.metrics.outcomes['non_dhcp'] += 1
+            self.log.debug('non_dhcp', src=f"{addr[0]}:{addr[1]}")
+            return []
         
-        # DHCP options
-        idx = 240
+        self.metrics.messages[packet.message_type] += 1
+        if now is None:
+            now = time.time()
         
-        # Option 53: DHCP Message Type
-        response[idx:idx+3] = bytes([53, 1, message_type])
-        idx += 3
+        # A retransmission of something we already answered gets the same bytes again
+        key = self.response_cache.key(packet)
+        replies = self.response_cache.get(key, now)
+        if replies is not None:
+            self.metrics.outcomes['retransmission'] += 1
+            self.log.debug('retransmission', packet.mac, xid=f"{packet.xid:08x}")
+            return replies
         
-        # Option 54: Server Identifier (REQUIRED)
-        response[idx:idx+6] = bytes([54, 4]) + socket.inet_aton(self.server_ip)
-        idx += 6
+        self._log_dhcp_request(packet, addr)
+        scope = self._select_scope(packet, local_ip)
+        if scope is None:
+            self.metrics.outcomes['no_scope'] += 1
+            self.log.warning('no_scope', packet.mac, giaddr=packet.giaddr)
+            return []
+        replies = self._decide(packet, scope, now)
+        if replies:
+            self.response_cache.put(key, replies, now)
+        return replies
+
+    def _decide(self, packet, scope, now):
+        """Lease decision for a parsed request; the (response, destination) pairs to send."""
+        mac = packet.mac
+        message_type = packet.message_type
         
-        # Option 51: IP Address Lease Time
-        response[idx:idx+6] = bytes([51, 4]) + struct.pack('!I', self.lease_duration)
-        idx += 6
+        if message_type == 1:  # DHCP Discover
+            # Check for static mapping first
+            if mac in scope.static_mappings:
+                offered_ip = scope.static_mappings[mac]
+                self.log.debug('static_mapping', mac, ip=offered_ip)
+            else:
+                # Existing lease/offer for this MAC, otherwise a free address held for it
+                existing = scope.leases.lookup_mac(mac, now)
+                offered_ip = scope.leases.offer(mac, now)
         
-        # Option 1: Subnet Mask
-        response[idx:idx+6] = bytes([1, 4]) + socket.inet_aton('255.255.255.0')
-        idx += 6
+                if offered_ip is None:
+                    self.metrics.outcomes['pool_exhausted'] += 1
+                    self.log.warning('pool_exhausted', mac)
+                    return []
+                self.log.debug('offer_existing' if existing else 'offer_new', mac, ip=offered_ip)
         
-        # Option 3: Router
-        response[idx:idx+6] = bytes([3, 4]) + socket.inet_aton(self.server_ip)
-        idx += 6
+            response = self._create_dhcp_offer(packet, offered_ip, scope)
+            dest = self._get_broadcast_address(packet)
+            return [(response, dest)]
         
-        # Option 6: Domain Name Server
-        response[idx:idx+6] = bytes([6, 4]) + socket.inet_aton('8.8.8.8')
-        idx += 6
+        elif message_type == 3:  # DHCP Request
+            # Get requested IP
+            requested_ip = packet.requested_ip or packet.ciaddr
         
-        # Option 255: End
-        response[idx] = 255
-        idx += 1
+            self.log.debug('requesting', mac, ip=requested_ip)
         
-        # Trim to actual size
-        return bytes(response[:idx])
-
-    def _create_dhcp_offer(self, packet, offered_ip):
-        mac_bytes = packet['chaddr'][:6]
-        print(f"Sending DHCP Offer for IP {offered_ip} to {':'.join([f'{b:02x}' for b in mac_bytes])}")
-        return self._create_dhcp_packet(packet, 2, offered_ip)  # Message type 2 = OFFER
-
-    def _create_dhcp_ack(self, packet, assigned_ip):
-        mac_bytes = packet['chaddr'][:6]
-        print(f"Sending DHCP ACK for IP {assigned_ip} to {':'.join([f'{b:02x}' for b in mac_bytes])}")
-        return self._create_dhcp_packet(packet, 5, assigned_ip)  # Message type 5 = ACK
-
-    def _get_broadcast_address(self, packet):
-        """Determine broadcast address based on flags"""
-        # If broadcast flag is set or ciaddr is 0.0.0.0, use broadcast
-        if packet['flags'] & 0x8000 or packet['ciaddr'] == '0.0.0.0':
-            return ('255.255.255.255', 68)
-        else:
-            # Could use ciaddr for unicast, but broadcast is safer
-            return ('255.255.255.255', 68)
+            # Check for static mapping
+            if mac in scope.static_mappings:
+                static_ip = scope.static_mappings[mac]
+                if requested_ip != static_ip:
+                    self.log.warning('static_override', mac, requested_ip=requested_ip, static_ip=static_ip)
+                    requested_ip = static_ip
+        
+            # Check if IP is valid and available
+            # Range arithmetic on the pool, set lookup for reservations
+            if scope.serves(requested_ip):
+                # Assign the IP unless it is already leased to another MAC
+                expiry = now + scope.lease_duration
+                if not scope.leases.assign(mac, requested_ip, expiry, now):
+                    self.metrics.outcomes['already_leased'] += 1
+                    self.log.warning('ip_conflict', mac, ip=requested_ip)
+                    return []
+                if self.journal:
+                    self.journal.grant(mac, requested_ip, expiry)
+        
+                response = self._create_dhcp_ack(packet, requested_ip, scope)
+                dest = self._get_broadcast_address(packet)
+        
+                self.log.info('lease_granted', mac, ip=requested_ip, static=mac in scope.static_mappings)
+                return [(response, dest)]
+            else:
+                self.metrics.outcomes['not_in_pool'] += 1
+                self.log.warning('invalid_request', mac, ip=requested_ip)
+        
+        elif message_type == 7:  # DHCP Release
+            released_ip = packet.ciaddr
+            if scope.leases.release(released_ip, mac):
+                if self.journal:
+                    self.journal.release(mac, released_ip)
+                self.metrics.outcomes['release'] += 1
+                self.log.info('released', mac, ip=released_ip)
+        
+        return []
 
     def run(self):
-        print(f"DHCP Server running on {self.server_ip}...")
-        print(f"Listening on port 67")
-        print(f"IP Pool: {self.ip_pool[0]} - {self.ip_pool[-1]}")
-        print(f"Lease Duration: {self.lease_duration} seconds")
-        
-        # Display static mappings
-        if self.static_mappings:
-            print("\n📌 Static MAC-to-IP Reservations:")
-            for mac, ip in self.static_mappings.items():
-                mac_str = ':'.join([f'{b:02x}' for b in mac])
-                print(f"  {mac_str} -> {ip}")
-        print()
+        self.server_socket = self._create_socket()
+        self._print_banner()
         
         while True:
             try:
                 data, addr = self.server_socket.recvfrom(2048)
-                packet = self._parse_dhcp_packet(data)
-                
-                if packet['message_type'] is None:
-                    print(f"Received non-DHCP packet from {addr}")
-                    continue
-                
-                self._log_dhcp_request(packet, addr)
-                
-                mac_tuple = tuple(packet['chaddr'][:6])
-                
-                if packet['message_type'] == 1:  # DHCP Discover
-                    # Check for static mapping first
-                    if mac_tuple in self.static_mappings:
-                        offered_ip = self.static_mappings[mac_tuple]
-                        print(f"⚡ Static mapping found: {':'.join([f'{b:02x}' for b in mac_tuple])} -> {offered_ip}")
-                    else:
-                        # Check if this MAC already has a lease
-                        existing_ip = None
-                        for ip, (mac, expiry) in list(self.leased_ips.items()):
-                            if mac == mac_tuple and time.time() < expiry:
-                                existing_ip = ip
-                                break
-                        
-                        if existing_ip:
-                            offered_ip = existing_ip
-                            print(f"Offering existing lease: {offered_ip}")
-                        else:
-                            # Select an available IP
-                            available_ips = [ip for ip in self.ip_pool 
-                                           if ip not in self.leased_ips or 
-                                           time.time() >= self.leased_ips[ip][1]]
-                            
-                            if available_ips:
-                                offered_ip = random.choice(available_ips)
-                                print(f"Offering new IP: {offered_ip}")
-                            else:
-                                print("No available IPs in pool")
-                                continue
-                    
-                    response = self._create_dhcp_offer(packet, offered_ip)
-                    dest = self._get_broadcast_address(packet)
+                received = time.perf_counter()
+                replies = self.handle_packet(data, addr)
+                for response, dest in replies:
                     self.server_socket.sendto(response, dest)
-                
-                elif packet['message_type'] == 3:  # DHCP Request
-                    # Get requested IP
-                    requested_ip = packet['requested_ip']
-                    if not requested_ip or requested_ip == '0.0.0.0':
-                        requested_ip = packet['ciaddr']
-                    
-                    print(f"Client requesting IP: {requested_ip}")
-                    
-                    # Check for static mapping
-                    if mac_tuple in self.static_mappings:
-                        static_ip = self.static_mappings[mac_tuple]
-                        if requested_ip != static_ip:
-                            print(f"⚠ Client requested {requested_ip} but static mapping requires {static_ip}")
-                            requested_ip = static_ip
-                    
-                    # Check if IP is valid and available
-                    if requested_ip in self.ip_pool or requested_ip in self.static_mappings.values():
-                        # Check if already leased to another MAC
-                        if requested_ip in self.leased_ips:
-                            existing_mac, expiry = self.leased_ips[requested_ip]
-                            if existing_mac != mac_tuple and time.time() < expiry:
-                                print(f"IP {requested_ip} already leased to another client")
-                                continue
-                        
-                        # Assign the IP
-                        self.leased_ips[requested_ip] = (mac_tuple, time.time() + self.lease_duration)
-                        response = self._create_dhcp_ack(packet, requested_ip)
-                        dest = self._get_broadcast_address(packet)
-                        self.server_socket.sendto(response, dest)
-                        
-                        if mac_tuple in self.static_mappings:
-                            print(f"✓ Static lease granted: {requested_ip} -> {':'.join([f'{b:02x}' for b in mac_tuple])}")
-                        else:
-                            print(f"✓ Lease granted: {requested_ip} -> {':'.join([f'{b:02x}' for b in mac_tuple])}")
-                    else:
-                        print(f"Requested IP {requested_ip} not in pool or invalid")
-                
-                elif packet['message_type'] == 7:  # DHCP Release
-                    released_ip = packet['ciaddr']
-                    if released_ip in self.leased_ips:
-                        del self.leased_ips[released_ip]
-                        print(f"Released IP: {released_ip}")
-                        
+                if replies:
+                    self.metrics.observe_latency(time.perf_counter() - received)
+            
             except Exception as e:
-                print(f"Error processing packet: {e}")
-                import traceback
-                traceback.print_exc()
+                self.metrics.outcomes['error'] += 1
+                self.log.exception('packet_error', error=str(e))
 
 if __name__ == "__main__":
-    server = DHCPServer()
+    server = DHCPServer(reservations=RESERVATIONS, journal_path='dhcp_leases', metrics_port=9103)
     server.run()
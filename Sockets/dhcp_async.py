@@ -0,0 +1,94 @@
+import asyncio
+import collections
+import time
+
+from dhcp import RESERVATIONS, DHCPServer
+
+# Tuning for the asyncio front end
+QUEUE_SIZE = 10000       # datagrams waiting for a decision before we start dropping
+BATCH_SIZE = 256         # datagrams decided per pass before yielding to the loop
+STATS_INTERVAL = 10
+
+
+class DHCPProtocol(asyncio.DatagramProtocol):
+    """Receives into a bounded queue and decides in batches, away from the console.
+
+    datagram_received() only enqueues (or counts a drop when the queue is
+    full); a separate task runs DHCPServer.handle_packet() over whole batches
+    and hands replies to the transport, which never blocks the loop. The
+    server's DHCPLogger writes from its own thread, so a slow terminal can't
+    hold up DORA either.
+    """
+
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+        self.queue = collections.deque()
+        self.ready = asyncio.Event()
+        self.stats = collections.Counter()
+        server.metrics.add_gauge('dhcp_queue_depth', 'Datagrams waiting for a decision', lambda: len(self.queue))
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.stats['received'] += 1
+        if len(self.queue) >= QUEUE_SIZE:
+            self.stats['dropped'] += 1
+            return
+        self.queue.append((data, addr, time.perf_counter()))
+        self.ready.set()
+
+    def error_received(self, exc):
+        self.stats['socket_errors'] += 1
+
+    async def process(self):
+        while True:
+            await self.ready.wait()
+            self.ready.clear()
+            while self.queue:
+                now = time.time()
+                for _ in range(min(BATCH_SIZE, len(self.queue))):
+                    data, addr, received = self.queue.popleft()
+                    try:
+                        replies = self.server.handle_packet(data, addr, now)
+                    except Exception as e:
+                        self.stats['errors'] += 1
+                        self.server.metrics.outcomes['error'] += 1
+                        self.server.log.exception('packet_error', error=str(e))
+                        continue
+                    for response, dest in replies:
+                        self.transport.sendto(response, dest)
+                        self.stats['sent'] += 1
+                    if replies:
+                        self.server.metrics.observe_latency(time.perf_counter() - received)
+                    self.stats['processed'] += 1
+                # Let the loop receive more datagrams between batches
+                await asyncio.sleep(0)
+
+    async def report_stats(self):
+        while True:
+            await asyncio.sleep(STATS_INTERVAL)
+            s = self.stats
+            self.server.log.info('stats', received=s['received'], processed=s['processed'], sent=s['sent'],
+                                 dropped=s['dropped'], errors=s['errors'], queue=len(self.queue))
+
+
+async def serve(server):
+    loop = asyncio.get_running_loop()
+    sock = server._create_socket()
+    sock.setblocking(False)
+    transport, protocol = await loop.create_datagram_endpoint(lambda: DHCPProtocol(server), sock=sock)
+    server._print_banner()
+    print(f"asyncio front end: queue {QUEUE_SIZE}, batch {BATCH_SIZE}\n")
+    try:
+        await asyncio.gather(protocol.process(), protocol.report_stats())
+    finally:
+        transport.close()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(serve(DHCPServer(reservations=RESERVATIONS, journal_path='dhcp_leases', metrics_port=9103)))
+    except KeyboardInterrupt:
+        print("\nStopping DHCP server...")
@@ -0,0 +1,341 @@
+import asyncio
+import collections
+import datetime
+import glob
+import json
+import multiprocessing
+import os
+import random
+import select
+import socket
+import struct
+import time
+
+from dhcp import DHCPServer
+from dhcp_log import WARNING
+
+# DORA load generator for loopback.
+#
+# Virtual clients share one UDP socket; replies are matched to transactions
+# by xid. Transactions are started open-loop at RATE per second (so a slow
+# server shows up as latency and timeouts rather than as a slower generator):
+# a client without a lease runs DISCOVER/OFFER/REQUEST/ACK, a client with
+# one renews or releases it. Results are written to RESULTS_DIR and compared
+# with the previous run.
+
+CLIENTS = 3000
+RATE = 2000                # transactions started per second
+DURATION = 10              # seconds of load
+TIMEOUT = 1.0              # seconds to wait for each reply before counting a drop
+RENEW_FRACTION = 0.3       # of transactions, when a leased client is available
+RELEASE_FRACTION = 0.05
+RESULTS_DIR = 'bench_results'
+
+# Server under test. With SPAWN_SERVER the benchmark starts one itself on
+# loopback, with a pool smaller than CLIENTS so exhaustion gets exercised.
+SPAWN_SERVER = True
+SERVER_FRONT_END = 'run'   # 'run' (DHCPServer.run) or 'async' (dhcp_async.serve)
+SERVER_ADDRESS = ('127.0.0.1', 6767)
+CLIENT_ADDRESS = ('127.0.0.1', 6868)
+SERVER_CONFIG = dict(
+    server_ip='10.10.0.1', subnet='10.10.0.0/16',
+    pool_ranges=(('10.10.0.10', '10.10.9.250'),),
+    log_level=WARNING,
+)
+
+MAGIC_COOKIE = b'\x63\x82\x53\x63'
+DISCOVER, OFFER, REQUEST, ACK, NAK, RELEASE = 1, 2, 3, 5, 6, 7
+
+
+def build_request(message_type, mac, xid, ciaddr=0, requested_ip=None, server_id=None):
+    packet = bytearray(240)
+    packet[0:4] = b'\x01\x01\x06\x00'  # BOOTREQUEST, Ethernet, 6-byte MAC, hops
+    struct.pack_into('!IHHI', packet, 4, xid, 0, 0x8000 if not ciaddr else 0, ciaddr)
+    packet[28:34] = mac
+    packet[236:240] = MAGIC_COOKIE
+    packet += bytes([53, 1, message_type])
+    if requested_ip is not None:
+        packet += bytes([50, 4]) + struct.pack('!I', requested_ip)
+    if server_id is not None:
+        packet += bytes([54, 4]) + struct.pack('!I', server_id)
+    packet += bytes([55, 3, 1, 3, 6, 255])
+    return bytes(packet)
+
+
+def parse_reply(data):
+    """(xid, message type, yiaddr, server identifier) of a reply, or None."""
+    if len(data) < 243 or data[0] != 2 or data[236:240] != MAGIC_COOKIE:
+        return None
+    xid, = struct.unpack_from('!I', data, 4)
+    yiaddr, = struct.unpack_from('!I', data, 16)
+    message_type = server_id = None
+    i = 240
+    while i + 1 < len(data) and data[i] != 255:
+        if data[i] == 0:
+            i += 1
+            continue
+        length = data[i + 1]
+        if data[i] == 53:
+            message_type = data[i + 2]
+        elif data[i] == 54 and length == 4:
+            server_id, = struct.unpack_from('!I', data, i + 2)
+        i += 2 + length
+    return xid, message_type, yiaddr, server_id
+
+
+def percentile(ordered, q):
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Client:
+    __slots__ = ('mac', 'ip', 'server_id')
+
+    def __init__(self, index):
+        self.mac = b'\x02' + index.to_bytes(5, 'big')  # locally administered
+        self.ip = None
+        self.server_id = None
+
+
+class Transaction:
+    __slots__ = ('kind', 'client', 'started', 'step')
+
+    def __init__(self, kind, client, started):
+        self.kind = kind
+        self.client = client
+        self.started = started
+        self.step = DISCOVER if kind == 'dora' else REQUEST
+
+
+class LoadGenerator:
+    def __init__(self, server_address=SERVER_ADDRESS, client_address=CLIENT_ADDRESS):
+        self.server_address = server_address
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+        self.sock.bind(client_address)
+        self.sock.setblocking(False)
+
+        self.clients = [Client(i) for i in range(CLIENTS)]
+        self.unleased = set(range(CLIENTS))  # idle clients without an address
+        self.leased = set()                  # idle clients holding one
+        self.pending = {}                    # xid -> Transaction
+        self.deadlines = collections.deque()  # (deadline, xid, step), in send order
+        self.next_xid = random.getrandbits(32)
+
+        self.latencies = collections.defaultdict(list)
+        self.counts = collections.defaultdict(collections.Counter)
+        self.leases_held_max = 0
+        self.exhausted_at = None  # leases held when the first DISCOVER went unanswered
+
+    def _xid(self):
+        self.next_xid = (self.next_xid + 1) & 0xFFFFFFFF
+        return self.next_xid
+
+    def _send(self, xid, step, data, now):
+        try:
+            self.sock.sendto(data, self.server_address)
+        except BlockingIOError:
+            self.counts[self.pending[xid].kind]['send_errors'] += 1
+        self.deadlines.append((now + TIMEOUT, xid, step))
+
+    def start_transaction(self, now):
+        r = random.random()
+        if self.leased and r < RELEASE_FRACTION:
+            kind, index = 'release', self.leased.pop()
+        elif self.leased and r < RELEASE_FRACTION + RENEW_FRACTION:
+            kind, index = 'renew', self.leased.pop()
+        elif self.unleased:
+            kind, index = 'dora', self.unleased.pop()
+        elif self.leased:
+            kind, index = 'renew', self.leased.pop()
+        else:
+            self.counts['dora']['no_idle_client'] += 1
+            return
+        client = self.clients[index]
+        self.counts[kind]['started'] += 1
+        xid = self._xid()
+
+        if kind == 'release':
+            self.sock.sendto(build_request(RELEASE, client.mac, xid, ciaddr=client.ip, server_id=client.server_id),
+                             self.server_address)
+            client.ip = None
+            self.unleased.add(index)
+            self.counts[kind]['completed'] += 1
+            return
+
+        self.pending[xid] = Transaction(kind, index, now)
+        if kind == 'dora':
+            self._send(xid, DISCOVER, build_request(DISCOVER, client.mac, xid), now)
+        else:
+            self._send(xid, REQUEST, build_request(REQUEST, client.mac, xid, ciaddr=client.ip), now)
+
+    def _finish(self, xid, transaction, leased):
+        del self.pending[xid]
+        (self.leased if leased else self.unleased).add(transaction.client)
+        self.leases_held_max = max(self.leases_held_max, len(self.leased))
+
+    def handle_reply(self, data, now):
+        reply = parse_reply(data)
+        if reply is None:
+            return
+        xid, message_type, yiaddr, server_id = reply
+        transaction = self.pending.get(xid)
+        if transaction is None:
+            self.counts['all']['late_or_duplicate'] += 1
+            return
+        client = self.clients[transaction.client]
+        counts = self.counts[transaction.kind]
+
+        if message_type == NAK:
+            counts['naks'] += 1
+            client.ip = None
+            self._finish(xid, transaction, False)
+        elif transaction.step == DISCOVER and message_type == OFFER:
+            transaction.step = REQUEST
+            client.server_id = server_id
+            self._send(xid, REQUEST, build_request(REQUEST, client.mac, xid, requested_ip=yiaddr,
+                                                   server_id=server_id), now)
+        elif transaction.step == REQUEST and message_type == ACK:
+            counts['completed'] += 1
+            self.latencies[transaction.kind].append(now - transaction.started)
+            client.ip = yiaddr
+            self._finish(xid, transaction, True)
+        else:
+            counts['unexpected'] += 1
+
+    def expire(self, now):
+        deadlines = self.deadlines
+        while deadlines and deadlines[0][0] <= now:
+            _, xid, step = deadlines.popleft()
+            transaction = self.pending.get(xid)
+            if transaction is None or transaction.step != step:
+                continue  # answered in time
+            counts = self.counts[transaction.kind]
+            counts['timeouts'] += 1
+            if step == DISCOVER:
+                counts['discover_timeouts'] += 1
+                if self.exhausted_at is None:
+                    self.exhausted_at = len(self.leased)
+            client = self.clients[transaction.client]
+            # A lost renewal leaves the lease in place; a lost DORA leaves none
+            self._finish(xid, transaction, transaction.kind == 'renew' and client.ip is not None)
+
+    def run(self):
+        interval = 1 / RATE
+        started = time.perf_counter()
+        end = started + DURATION
+        next_start = started
+        sock = self.sock
+        while True:
+            now = time.perf_counter()
+            if now >= end and not self.pending:
+                break
+            while next_start <= now and next_start < end:
+                self.start_transaction(now)
+                next_start += interval
+
+            wait = max(0, min(next_start if next_start < end else end + TIMEOUT, now + 0.01) - now)
+            if select.select([sock], [], [], wait)[0]:
+                while True:
+                    try:
+                        data = sock.recv(2048)
+                    except BlockingIOError:
+                        break
+                    self.handle_reply(data, time.perf_counter())
+            self.expire(time.perf_counter())
+        return self.report(time.perf_counter() - started)
+
+    def report(self, elapsed):
+        transactions = {}
+        completed = 0
+        for kind in ('dora', 'renew', 'release'):
+            counts = self.counts[kind]
+            ordered = sorted(self.latencies[kind])
+            completed += counts['completed']
+            transactions[kind] = dict(
+                counts,
+                tps=round(counts['completed'] / elapsed, 1),
+                p50_ms=_ms(percentile(ordered, 0.50)),
+                p99_ms=_ms(percentile(ordered, 0.99)),
+                p999_ms=_ms(percentile(ordered, 0.999)),
+            )
+        return {
+            'elapsed': round(elapsed, 3),
+            'tps': round(completed / elapsed, 1),
+            'transactions': transactions,
+            'late_or_duplicate': self.counts['all']['late_or_duplicate'],
+            'pool': {
+                'leases_held_max': self.leases_held_max,
+                'leases_held_at_first_discover_timeout': self.exhausted_at,
+            },
+        }
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+def serve(front_end, config):
+    server = DHCPServer(bind_address=SERVER_ADDRESS[0], port=SERVER_ADDRESS[1], client_port=CLIENT_ADDRESS[1],
+                        reply_address=CLIENT_ADDRESS[0], **config)
+    if front_end == 'async':
+        import dhcp_async
+        asyncio.run(dhcp_async.serve(server))
+    else:
+        server.run()
+
+
+def save(results):
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    previous = sorted(glob.glob(os.path.join(RESULTS_DIR, 'dhcp_bench_*.json')))
+    stamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+    path = os.path.join(RESULTS_DIR, f'dhcp_bench_{stamp}.json')
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved to {path}")
+
+    if previous:
+        with open(previous[-1]) as f:
+            last = json.load(f)
+        print(f"Compared with {previous[-1]}:")
+        print(f"  tps        {last['tps']:>10} -> {results['tps']}")
+        for kind in ('dora', 'renew'):
+            before, after = last['transactions'][kind], results['transactions'][kind]
+            print(f"  {kind:<5} p99  {before['p99_ms']!s:>10} -> {after['p99_ms']} ms")
+
+
+def main():
+    server = None
+    if SPAWN_SERVER:
+        server = multiprocessing.Process(target=serve, args=(SERVER_FRONT_END, SERVER_CONFIG), daemon=True)
+        server.start()
+        time.sleep(1)  # let it bind
+
+    print(f"DHCP load: {CLIENTS} clients, {RATE} transactions/s for {DURATION}s against "
+          f"{SERVER_ADDRESS[0]}:{SERVER_ADDRESS[1]}")
+    results = LoadGenerator().run()
+    if server:
+        server.terminate()
+
+    results['config'] = dict(
+        clients=CLIENTS, rate=RATE, duration=DURATION, timeout=TIMEOUT,
+        renew_fraction=RENEW_FRACTION, release_fraction=RELEASE_FRACTION,
+        front_end=SERVER_FRONT_END if SPAWN_SERVER else 'external',
+        pool=SERVER_CONFIG['pool_ranges'] if SPAWN_SERVER else None,
+    )
+    print(f"\n{results['tps']} transactions/s over {results['elapsed']}s")
+    for kind, stats in results['transactions'].items():
+        line = (f"  {kind:<8} started={stats.get('started', 0)} completed={stats.get('completed', 0)} "
+                f"timeouts={stats.get('timeouts', 0)} naks={stats.get('naks', 0)}")
+        if stats['p50_ms'] is not None:
+            line += f" p50={stats['p50_ms']}ms p99={stats['p99_ms']}ms p999={stats['p999_ms']}ms"
+        print(line)
+    pool = results['pool']
+    print(f"  leases held (max): {pool['leases_held_max']}, "
+          f"first unanswered DISCOVER at {pool['leases_held_at_first_discover_timeout']} leases")
+    save(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import collections
+import json
+import sys
+import threading
+import time
+import traceback
+
+from pools import int_to_ip
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+LEVEL_NAMES = {DEBUG: 'debug', INFO: 'info', WARNING: 'warning', ERROR: 'error'}
+
+# Fields holding integer IPv4 addresses; written out in dotted form
+IP_FIELDS = {'ip', 'requested_ip', 'static_ip', 'ciaddr', 'yiaddr', 'siaddr', 'giaddr'}
+
+QUEUE_SIZE = 100000     # records waiting for the writer before new ones are dropped
+FLUSH_INTERVAL = 0.1
+CLIENT_RATE = 20        # records per second per client MAC, on average...
+CLIENT_BURST = 50       # ...with bursts up to this many
+MAX_CLIENTS = 100000    # rate-limit buckets kept before they are reset
+
+
+class DHCPLogger:
+    """Levelled, structured DHCP event log, formatted and written off the hot path.
+
+    A call that passes the level check only appends a tuple of raw values
+    (ints, bytes) to a bounded deque. A background thread turns the queued
+    records into JSON lines - dotted IPs, colon-separated MACs - and writes
+    each batch with a single write(). Records below WARNING are rate limited
+    per client MAC with a token bucket, so one chatty client can't flood the
+    log; what was suppressed or dropped is reported in a periodic log_stats
+    record.
+    """
+
+    def __init__(self, stream=None, level=INFO, client_rate=CLIENT_RATE, client_burst=CLIENT_BURST,
+                 queue_size=QUEUE_SIZE, flush_interval=FLUSH_INTERVAL, **context):
+        self.stream = stream or sys.stdout
+        self.level = level
+        self.client_rate = client_rate
+        self.client_burst = client_burst
+        self.queue_size = queue_size
+        self.flush_interval = flush_interval
+        self.context = context  # added to every record, e.g. worker=3
+        self.records = collections.deque()
+        self.buckets = {}  # mac -> [tokens, last refill]
+        # Only ever incremented, by callers of log(); the writer reports the
+        # change since its last log_stats rather than resetting them, which
+        # would lose increments made between its read and its write
+        self.suppressed = 0
+        self.dropped = 0
+        self.reported = (0, 0)  # (suppressed, dropped) at the last log_stats
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self._writer, name='dhcp-log', daemon=True)
+        self.thread.start()
+
+    def enabled(self, level):
+        return level >= self.level
+
+    def _allow(self, mac, now):
+        bucket = self.buckets.get(mac)
+        if bucket is None:
+            if len(self.buckets) >= MAX_CLIENTS:
+                self.buckets.clear()
+            self.buckets[mac] = [self.client_burst - 1, now]
+            return True
+        tokens = min(self.client_burst, bucket[0] + (now - bucket[1]) * self.client_rate)
+        bucket[1] = now
+        if tokens < 1:
+            bucket[0] = tokens
+            return False
+        bucket[0] = tokens - 1
+        return True
+
+    def log(self, level, event, mac=None, **fields):
+        if level < self.level:
+            return
+        now = time.time()
+        if mac is not None and level < WARNING and not self._allow(mac, now):
+            self.suppressed += 1
+            return
+        if len(self.records) >= self.queue_size:
+            self.dropped += 1
+            return
+        self.records.append((now, level, event, mac, fields))
+
+    def debug(self, event, mac=None, **fields):
+        self.log(DEBUG, event, mac, **fields)
+
+    def info(self, event, mac=None, **fields):
+        self.log(INFO, event, mac, **fields)
+
+    def warning(self, event, mac=None, **fields):
+        self.log(WARNING, event, mac, **fields)
+
+    def error(self, event, mac=None, **fields):
+        self.log(ERROR, event, mac, **fields)
+
+    def exception(self, event, mac=None, **fields):
+        """ERROR record carrying the traceback of the exception being handled."""
+        self.log(ERROR, event, mac, traceback=traceback.format_exc(), **fields)
+
+    # Writer thread
+
+    def _format(self, record):
+        when, level, event, mac, fields = record
+        out = {'ts': round(when, 6), 'level': LEVEL_NAMES.get(level, level), 'event': event}
+        out.update(self.context)
+        if mac is not None:
+            out['mac'] = mac.hex(':')
+        for key, value in fields.items():
+            if key in IP_FIELDS and isinstance(value, int):
+                value = int_to_ip(value)
+            elif isinstance(value, (bytes, bytearray)):
+                value = value.hex()
+            out[key] = value
+        return json.dumps(out, separators=(',', ':'), default=str)
+
+    def _writer(self):
+        while not self.stopping.wait(self.flush_interval):
+            self._flush()
+        self._flush()
+
+    def _flush(self):
+        records = self.records
+        batch = [records.popleft() for _ in range(len(records))]
+        counts = (self.suppressed, self.dropped)
+        if counts != self.reported:
+            batch.append((time.time(), WARNING, 'log_stats', None,
+                          {'suppressed': counts[0] - self.reported[0], 'dropped': counts[1] - self.reported[1]}))
+            self.reported = counts
+        if not batch:
+            return
+        self.stream.write(''.join(self._format(r) + '\n' for r in batch))
+        self.stream.flush()
+
+    def close(self):
+        """Write out whatever is queued and stop the writer thread."""
+        self.stopping.set()
+        self.thread.join()
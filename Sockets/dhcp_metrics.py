@@ -0,0 +1,139 @@
+import bisect
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# In-process DHCP server metrics, served on a local HTTP endpoint
+#   /metrics       Prometheus text format
+#   /metrics.json  JSON
+#
+# Same idea as Client Side/metrics.py, shaped for a packet path: recording is
+# a list or dict item increment on pre-created slots (no objects, no locks -
+# everything is written by the thread that serves packets), and anything that
+# can be derived at scrape time - pool utilisation, queue depth, cache size -
+# is a callable evaluated only when someone scrapes.
+
+MESSAGE_NAMES = {1: 'discover', 2: 'offer', 3: 'request', 4: 'decline', 5: 'ack', 6: 'nak', 7: 'release',
+                 8: 'inform'}
+OUTCOMES = ('offer', 'ack', 'not_in_pool', 'already_leased', 'pool_exhausted', 'release', 'retransmission',
+            'non_dhcp', 'no_scope', 'error', 'forward_dropped')
+LATENCY_BUCKETS = [0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25]
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in labels.items()) + '}'
+
+
+class DHCPMetrics:
+    def __init__(self, server_name='dhcp'):
+        self.server_name = server_name
+        self.messages = [0] * 256  # received, indexed by option 53 value
+        self.outcomes = dict.fromkeys(OUTCOMES, 0)
+        self.latency_counts = [0] * (len(LATENCY_BUCKETS) + 1)  # last slot is +Inf
+        self.latency_sum = 0.0
+        self.latency_count = 0
+        self.scopes = {}  # name -> (pool, leases)
+        self.gauges = {}  # name -> (help, fn)
+
+    # Hot path
+
+    def observe_latency(self, seconds):
+        """Receive-to-send time of one answered datagram."""
+        self.latency_counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.latency_sum += seconds
+        self.latency_count += 1
+
+    # Scrape-time values
+
+    def add_scope(self, name, pool, leases):
+        self.scopes[name] = (pool, leases)
+
+    def add_gauge(self, name, help_text, fn):
+        self.gauges[name] = (help_text, fn)
+
+    def _scope_rows(self):
+        for name, (pool, leases) in list(self.scopes.items()):
+            size = len(pool)
+            used = size - leases.free_count()
+            yield name, size, used, used / size if size else 0.0
+
+    def prometheus(self):
+        lines = ["# HELP dhcp_messages_received_total DHCP requests received, by message type",
+                 "# TYPE dhcp_messages_received_total counter"]
+        for code, name in MESSAGE_NAMES.items():
+            lines.append(f'dhcp_messages_received_total{{type="{name}"}} {self.messages[code]}')
+
+        lines += ["# HELP dhcp_outcomes_total Decisions taken, by outcome",
+                  "# TYPE dhcp_outcomes_total counter"]
+        for outcome, value in list(self.outcomes.items()):
+            lines.append(f'dhcp_outcomes_total{{outcome="{outcome}"}} {value}')
+
+        lines += ["# HELP dhcp_reply_latency_seconds Receive-to-send time of answered requests",
+                  "# TYPE dhcp_reply_latency_seconds histogram"]
+        running = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.latency_counts):
+            running += count
+            lines.append(f'dhcp_reply_latency_seconds_bucket{{le="{bound}"}} {running}')
+        lines.append(f'dhcp_reply_latency_seconds_bucket{{le="+Inf"}} {self.latency_count}')
+        lines.append(f"dhcp_reply_latency_seconds_sum {self.latency_sum}")
+        lines.append(f"dhcp_reply_latency_seconds_count {self.latency_count}")
+
+        rows = list(self._scope_rows())
+        for metric, help_text, column in (('dhcp_pool_size', 'Addresses in the dynamic pool', 1),
+                                          ('dhcp_pool_used', 'Pool addresses offered or leased', 2),
+                                          ('dhcp_pool_utilization', 'Fraction of the pool in use', 3)):
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} gauge"]
+            for row in rows:
+                lines.append(f"{metric}{_format_labels({'scope': row[0]})} {row[column]}")
+
+        for name, (help_text, fn) in list(self.gauges.items()):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {fn()}"]
+        return '\n'.join(lines) + '\n'
+
+    def snapshot(self):
+        return {
+            'server': self.server_name,
+            'time': time.time(),
+            'messages': {name: self.messages[code] for code, name in MESSAGE_NAMES.items()},
+            'outcomes': dict(self.outcomes),
+            'latency': {
+                'count': self.latency_count,
+                'sum': self.latency_sum,
+                'buckets': dict(zip([str(b) for b in LATENCY_BUCKETS] + ['+Inf'], self.latency_counts)),
+            },
+            'scopes': {name: {'size': size, 'used': used, 'utilization': utilization}
+                       for name, size, used, utilization in self._scope_rows()},
+            'gauges': {name: fn() for name, (help_text, fn) in list(self.gauges.items())},
+        }
+
+
+def start_http_server(port, metrics, host='127.0.0.1'):
+    """Serve `metrics` in a background thread. Returns the server."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.startswith('/metrics.json'):
+                body = json.dumps(metrics.snapshot()).encode()
+                content_type = 'application/json'
+            elif self.path.startswith('/metrics'):
+                body = metrics.prometheus().encode()
+                content_type = 'text/plain; version=0.0.4'
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # keep scrapes out of the server's log
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,180 @@
+import struct
+
+MAGIC_COOKIE = b'\x63\x82\x53\x63'
+BOOTREQUEST = 1
+MIN_LENGTH = 241  # BOOTP header + magic cookie + at least one option byte
+
+_U16 = struct.Struct('!H')
+_U32 = struct.Struct('!I')
+
+
+class DHCPPacket:
+    """Read-only view over a received DHCP datagram.
+
+    Nothing is copied up front: header fields are unpacked from the buffer
+    when they are read, addresses come back as integers, and the options are
+    indexed (code -> value offset) in a single scan. parse() returns None for
+    anything that isn't a DHCP request before any of that happens.
+    """
+    __slots__ = ('buf', 'options')
+
+    def __init__(self, buf, options):
+        self.buf = buf
+        self.options = options
+
+    @classmethod
+    def parse(cls, data):
+        if len(data) < MIN_LENGTH or data[0] != BOOTREQUEST:
+            return None
+        buf = memoryview(data)
+        if buf[236:240] != MAGIC_COOKIE:
+            return None
+
+        options = {}
+        i = 240
+        end = len(buf)
+        while i < end:
+            code = buf[i]
+            if code == 255:  # End option
+                break
+            if code == 0:  # Pad option
+                i += 1
+                continue
+            if i + 1 >= end:
+                break
+            length = buf[i + 1]
+            if i + 2 + length > end:
+                break
+            options[code] = i + 2
+            i += 2 + length
+
+        # Option 53 (message type) is what makes BOOTP a DHCP packet
+        if 53 not in options:
+            return None
+        return cls(buf, options)
+
+    # BOOTP header
+    op = property(lambda self: self.buf[0])
+    htype = property(lambda self: self.buf[1])
+    hlen = property(lambda self: self.buf[2])
+    hops = property(lambda self: self.buf[3])
+    xid = property(lambda self: _U32.unpack_from(self.buf, 4)[0])
+    secs = property(lambda self: _U16.unpack_from(self.buf, 8)[0])
+    flags = property(lambda self: _U16.unpack_from(self.buf, 10)[0])
+    ciaddr = property(lambda self: _U32.unpack_from(self.buf, 12)[0])
+    yiaddr = property(lambda self: _U32.unpack_from(self.buf, 16)[0])
+    siaddr = property(lambda self: _U32.unpack_from(self.buf, 20)[0])
+    giaddr = property(lambda self: _U32.unpack_from(self.buf, 24)[0])
+    chaddr = property(lambda self: self.buf[28:44])
+    sname = property(lambda self: self.buf[44:108])
+    file = property(lambda self: self.buf[108:236])
+
+    @property
+    def mac(self):
+        """First six bytes of chaddr, as a hashable key."""
+        return self.buf[28:34].tobytes()
+
+    def option(self, code):
+        """Raw value of an option as a view into the datagram, or None."""
+        offset = self.options.get(code)
+        if offset is None:
+            return None
+        return self.buf[offset:offset + self.buf[offset - 1]]
+
+    @property
+    def message_type(self):
+        return self.buf[self.options[53]]
+
+    @property
+    def requested_ip(self):
+        offset = self.options.get(50)
+        if offset is None or self.buf[offset - 1] != 4:
+            return None
+        return _U32.unpack_from(self.buf, offset)[0]
+
+    @property
+    def hostname(self):
+        value = self.option(12)
+        return None if value is None else value.tobytes().decode('ascii', errors='ignore')
+
+    @property
+    def parameter_request_list(self):
+        value = self.option(55)
+        return b'' if value is None else value.tobytes()
+
+
+class ResponseBuilder:
+    """OFFER/ACK encoder for one scope.
+
+    Everything that is the same for every client - BOOTP header, magic cookie,
+    server identifier, lease time, mask, router, DNS - is encoded once into a
+    template. build() copies the template into a reusable buffer, patches the
+    per-client fields and appends the pre-encoded blocks for the options the
+    client listed in option 55.
+    """
+
+    TYPE_OFFSET = 242  # value byte of option 53, right after the magic cookie
+    PRL_CACHE_SIZE = 256
+
+    def __init__(self, server_ip, lease_duration, netmask, router, dns_server, extra_options=None):
+        header = bytearray(240)
+        header[0] = 2  # op: BOOTREPLY
+        _U32.pack_into(header, 20, server_ip)  # siaddr: server IP
+        header[236:240] = MAGIC_COOKIE
+
+        options = bytearray()
+        options += bytes([53, 1, 0])  # DHCP Message Type, patched per reply
+        options += bytes([54, 4]) + _U32.pack(server_ip)  # Server Identifier
+        options += bytes([51, 4]) + _U32.pack(lease_duration)  # IP Address Lease Time
+        options += bytes([1, 4]) + _U32.pack(netmask)  # Subnet Mask
+        options += bytes([3, 4]) + _U32.pack(router)  # Router
+        options += bytes([6, 4]) + _U32.pack(dns_server)  # Domain Name Server
+        self.template = bytes(header + options)
+
+        # Only sent when the client asks for them in option 55
+        self.option_blocks = {}
+        for code, value in (extra_options or {}).items():
+            self.option_blocks[code] = bytes([code, len(value)]) + value
+        self.prl_cache = {}
+
+        size = len(self.template) + sum(len(b) for b in self.option_blocks.values()) + 1
+        self.buffer = bytearray(max(576, size))
+        self.view = memoryview(self.buffer)
+
+    def _requested_blocks(self, prl):
+        blocks = self.prl_cache.get(prl)
+        if blocks is None:
+            # Each option once, however often the client lists it, and never
+            # more than fits in the buffer after the template and End
+            room = len(self.buffer) - len(self.template) - 1
+            parts = []
+            for code in dict.fromkeys(prl):
+                block = self.option_blocks.get(code)
+                if block is not None and len(block) <= room:
+                    parts.append(block)
+                    room -= len(block)
+            blocks = b''.join(parts)
+            if len(self.prl_cache) >= self.PRL_CACHE_SIZE:
+                self.prl_cache.clear()
+            self.prl_cache[prl] = blocks
+        return blocks
+
+    def build(self, packet, message_type, yiaddr, giaddr=0):
+        buf = self.buffer
+        n = len(self.template)
+        buf[:n] = self.template
+        buf[1] = packet.htype  # htype: same as request
+        buf[2] = packet.hlen  # hlen: same as request
+        buf[4:8] = packet.buf[4:8]  # xid: must match request
+        buf[10:12] = packet.buf[10:12]  # flags: copy from request
+        _U32.pack_into(buf, 16, yiaddr)  # yiaddr: offered IP
+        _U32.pack_into(buf, 24, giaddr)  # giaddr: relay, if any
+        buf[28:44] = packet.chaddr  # chaddr: client hardware address (16 bytes)
+        buf[self.TYPE_OFFSET] = message_type
+
+        if self.option_blocks and 55 in packet.options:
+            blocks = self._requested_blocks(packet.parameter_request_list)
+            buf[n:n + len(blocks)] = blocks
+            n += len(blocks)
+        buf[n] = 255  # End
+        return self.view[:n + 1].tobytes()
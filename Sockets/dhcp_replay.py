@@ -0,0 +1,270 @@
+import json
+import socket
+import struct
+import sys
+import time
+
+from dhcp import RESERVATIONS, DHCPServer
+from dhcp_log import WARNING, DHCPLogger
+from dhcp_packet import DHCPPacket
+
+# Replays captured DHCP traffic through DHCPServer.handle_packet() - no
+# sockets, no network. Every client->server datagram (UDP to SERVER_PORT) in
+# a classic pcap or pcapng capture is handed to the engine with the capture
+# timestamp as `now`, so offers, lease expiry and reclaiming follow the
+# capture's clock rather than the wall clock. Each decision is written as a
+# JSON line to the output file.
+#
+#   python dhcp_replay.py capture.pcapng [decisions.jsonl]
+
+SPEED = 0              # 0 = as fast as possible, 1 = original timing, 2 = twice as fast, ...
+SERVER_PORT = 67       # requests are UDP datagrams to this port
+RECORD_BYTES = False   # also write every reply as hex
+SERVER_CONFIG = dict(reservations=RESERVATIONS, log_level=WARNING)
+
+MESSAGE_NAMES = {1: 'discover', 2: 'offer', 3: 'request', 4: 'decline', 5: 'ack', 6: 'nak', 7: 'release',
+                 8: 'inform'}
+
+# Link-layer header types (https://www.tcpdump.org/linktypes.html)
+LINKTYPE_NULL = 0
+LINKTYPE_ETHERNET = 1
+LINKTYPE_RAW = 101
+LINKTYPE_LINUX_SLL = 113
+LINKTYPE_IPV4 = 228
+LINKTYPE_LINUX_SLL2 = 276
+
+
+def read_pcap(f, header):
+    """(timestamp, linktype, frame) for every record of a classic pcap file."""
+    magic = header[:4]
+    if magic in (b'\xd4\xc3\xb2\xa1', b'\x4d\x3c\xb2\xa1'):
+        endian = '<'
+    elif magic in (b'\xa1\xb2\xc3\xd4', b'\xa1\xb2\x3c\x4d'):
+        endian = '>'
+    else:
+        raise ValueError(f"Not a pcap or pcapng file (magic {magic.hex()})")
+    scale = 1e-9 if magic in (b'\x4d\x3c\xb2\xa1', b'\xa1\xb2\x3c\x4d') else 1e-6
+    rest = f.read(16)  # rest of the 24-byte global header
+    linktype = struct.unpack(endian + 'I', rest[12:16])[0] & 0x0FFFFFFF
+    record = struct.Struct(endian + 'IIII')
+    while True:
+        head = f.read(record.size)
+        if len(head) < record.size:
+            return
+        seconds, fraction, captured, _ = record.unpack(head)
+        frame = f.read(captured)
+        if len(frame) < captured:
+            return
+        yield seconds + fraction * scale, linktype, frame
+
+
+def read_pcapng(f, header):
+    """(timestamp, linktype, frame) for every packet block of a pcapng file.
+
+    A block that cannot be decoded (truncated body, or a packet on an
+    interface with no Interface Description Block) is yielded with linktype
+    None and skipped by the caller; a block length that breaks the framing
+    raises ValueError, as nothing after it can be found.
+    """
+    endian = '<'
+    interfaces = []  # (linktype, seconds per timestamp unit), per section
+    last_timestamp = 0.0
+    head = header
+    while len(head) == 8:
+        offset = f.tell() - 8
+        if head[:4] == b'\x0a\x0d\x0d\x0a':  # Section Header Block: its byte-order magic sets the endianness
+            byte_order = f.read(4)
+            if byte_order not in (b'\x4d\x3c\x2b\x1a', b'\x1a\x2b\x3c\x4d'):
+                raise ValueError(f"Bad pcapng section header at offset {offset}")
+            endian = '<' if byte_order == b'\x4d\x3c\x2b\x1a' else '>'
+            interfaces = []
+            block_type, length = 0x0A0D0D0A, struct.unpack(endian + 'I', head[4:8])[0]
+            if length < 28 or length % 4:
+                raise ValueError(f"Bad pcapng block length {length} at offset {offset}")
+            body = byte_order + f.read(length - 12)
+        else:
+            block_type, length = struct.unpack(endian + 'II', head)
+            if length < 12 or length % 4:
+                raise ValueError(f"Bad pcapng block length {length} at offset {offset}")
+            body = f.read(length - 8)
+        if len(body) < length - 8:
+            return
+        body = body[:length - 12]  # drop the trailing length copy
+
+        packet = None
+        try:
+            if block_type == 1:  # Interface Description Block
+                linktype = struct.unpack_from(endian + 'H', body, 0)[0]
+                interfaces.append((linktype, _tsresol(body[8:], endian)))
+            elif block_type == 6:  # Enhanced Packet Block
+                interface, high, low, captured = struct.unpack_from(endian + 'IIII', body, 0)
+                linktype, unit = interfaces[interface]
+                last_timestamp = ((high << 32) | low) * unit
+                packet = linktype, body[20:20 + captured]
+            elif block_type == 3:  # Simple Packet Block: no timestamp, keep the clock where it was
+                packet = interfaces[0][0], body[4:]
+            elif block_type == 2:  # obsolete Packet Block
+                interface, _, high, low, captured = struct.unpack_from(endian + 'HHIII', body, 0)
+                linktype, unit = interfaces[interface]
+                last_timestamp = ((high << 32) | low) * unit
+                packet = linktype, body[20:20 + captured]
+        except (struct.error, IndexError):
+            packet = None, b''
+        if packet:
+            yield last_timestamp, packet[0], packet[1]
+        head = f.read(8)
+
+
+def _tsresol(options, endian):
+    """Timestamp unit from an IDB's if_tsresol option (default microseconds)."""
+    i = 0
+    while i + 4 <= len(options):
+        code, length = struct.unpack_from(endian + 'HH', options, i)
+        if code == 0:
+            break
+        if code == 9 and length >= 1:
+            value = options[i + 4]
+            return 2.0 ** -(value & 0x7F) if value & 0x80 else 10.0 ** -value
+        i += 4 + (length + 3) // 4 * 4
+    return 1e-6
+
+
+def read_capture(path):
+    with open(path, 'rb') as f:
+        header = f.read(8)
+        if header[:4] == b'\x0a\x0d\x0d\x0a':
+            yield from read_pcapng(f, header)
+        else:
+            yield from read_pcap(f, header)
+
+
+def udp_datagram(linktype, frame):
+    """(source IP, source port, destination port, payload) of an IPv4/UDP frame, or None."""
+    if linktype == LINKTYPE_ETHERNET:
+        offset, ethertype = 14, frame[12:14]
+        while ethertype in (b'\x81\x00', b'\x88\xa8'):  # VLAN tags
+            ethertype = frame[offset + 2:offset + 4]
+            offset += 4
+        if ethertype != b'\x08\x00':
+            return None
+    elif linktype in (LINKTYPE_RAW, LINKTYPE_IPV4, 12):
+        offset = 0
+    elif linktype == LINKTYPE_LINUX_SLL:
+        if frame[14:16] != b'\x08\x00':
+            return None
+        offset = 16
+    elif linktype == LINKTYPE_LINUX_SLL2:
+        if frame[0:2] != b'\x08\x00':
+            return None
+        offset = 20
+    elif linktype == LINKTYPE_NULL:
+        offset = 4
+    else:
+        return None
+
+    if len(frame) < offset + 28 or frame[offset] >> 4 != 4 or frame[offset + 9] != 17:
+        return None
+    if struct.unpack_from('!H', frame, offset + 6)[0] & 0x3FFF:
+        return None  # fragment
+    udp = offset + (frame[offset] & 0x0F) * 4
+    if len(frame) < udp + 8:
+        return None
+    source_port, destination_port, length = struct.unpack_from('!HHH', frame, udp)
+    source = socket.inet_ntoa(frame[offset + 12:offset + 16])
+    return source, source_port, destination_port, bytes(frame[udp + 8:udp + length])
+
+
+def replay(path, server, out, speed=SPEED):
+    """Feed every DHCP request in the capture to `server`; returns a summary."""
+    stats = {'frames': 0, 'bad_blocks': 0, 'requests': 0, 'replies': 0}
+    outcomes = server.metrics.outcomes
+    first_capture = first_wall = None
+    started = time.perf_counter()
+
+    for timestamp, linktype, frame in read_capture(path):
+        if linktype is None:
+            stats['bad_blocks'] += 1
+            continue
+        stats['frames'] += 1
+        datagram = udp_datagram(linktype, frame)
+        if datagram is None or datagram[2] != SERVER_PORT:
+            continue
+        source, source_port, _, payload = datagram
+        stats['requests'] += 1
+
+        if speed:
+            if first_capture is None:
+                first_capture, first_wall = timestamp, time.perf_counter()
+            delay = first_wall + (timestamp - first_capture) / speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+        before = dict(outcomes)
+        error = None
+        try:
+            replies = server.handle_packet(payload, (source, source_port), now=timestamp)
+        except Exception as e:
+            # As in DHCPServer.run(): one bad packet must not end the replay
+            outcomes['error'] += 1
+            server.log.exception('packet_error', error=str(e))
+            replies, error = [], f"{type(e).__name__}: {e}"
+        stats['replies'] += len(replies)
+
+        packet = DHCPPacket.parse(payload)
+        record = {
+            'ts': timestamp,
+            'src': f"{source}:{source_port}",
+            'mac': packet.mac.hex(':') if packet else None,
+            'xid': f"{packet.xid:08x}" if packet else None,
+            'type': MESSAGE_NAMES.get(packet.message_type, packet.message_type) if packet else None,
+            'outcome': [name for name, count in outcomes.items() if count != before[name]],
+            'replies': [],
+        }
+        if error:
+            record['error'] = error
+        for response, dest in replies:
+            reply = {'type': MESSAGE_NAMES.get(response[242]), 'yiaddr': socket.inet_ntoa(response[16:20]),
+                     'dest': f"{dest[0]}:{dest[1]}"}
+            if RECORD_BYTES:
+                reply['bytes'] = response.hex()
+            record['replies'].append(reply)
+        out.write(json.dumps(record, separators=(',', ':')) + '\n')
+
+    elapsed = time.perf_counter() - started
+    stats['elapsed'] = round(elapsed, 3)
+    stats['requests_per_second'] = round(stats['requests'] / elapsed, 1) if elapsed else None
+    stats['outcomes'] = dict(outcomes)
+    return stats
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("usage: python dhcp_replay.py capture.pcap[ng] [decisions.jsonl]")
+        sys.exit(1)
+    path = sys.argv[1]
+    output = sys.argv[2] if len(sys.argv) > 2 else path.rsplit('.', 1)[0] + '.decisions.jsonl'
+
+    server = DHCPServer(**SERVER_CONFIG)
+    server.log.close()
+    server.log = DHCPLogger(stream=sys.stderr, level=server.log.level)
+
+    print(f"Replaying {path} ({'as fast as possible' if not SPEED else f'{SPEED}x original timing'})")
+    try:
+        with open(output, 'w') as out:
+            stats = replay(path, server, out, SPEED)
+    except ValueError as e:
+        print(f"Cannot replay {path}: {e}")
+        sys.exit(1)
+    finally:
+        server.log.close()
+
+    print(f"{stats['frames']} frames, {stats['requests']} DHCP requests, {stats['replies']} replies "
+          f"in {stats['elapsed']}s ({stats['requests_per_second']} requests/s)")
+    if stats['bad_blocks']:
+        print(f"Skipped {stats['bad_blocks']} capture blocks that could not be decoded")
+    print("Outcomes: " + ', '.join(f"{name}={count}" for name, count in stats['outcomes'].items() if count))
+    print(f"Decisions written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+import multiprocessing
+import multiprocessing.connection
+import os
+import socket
+import struct
+import sys
+import time
+import zlib
+
+from dhcp import RESERVATIONS, DHCPServer
+from dhcp_metrics import start_http_server
+from lease_journal import LeaseJournal
+from leases import LeaseTable
+
+# Multi-process DHCP serving.
+#
+# Every client MAC belongs to exactly one worker (crc32 of the MAC, so all
+# processes agree), and every worker hands out addresses only from its own
+# contiguous slice of the pool. Two workers therefore can never offer the
+# same address, and no lease state has to be shared between processes.
+#
+# - "reuseport" (Linux): every worker binds port 67 with SO_REUSEPORT.
+#   Broadcasts reach every worker and each one keeps only the MACs it owns;
+#   unicast datagrams (renewals) land on one worker, which forwards them to
+#   the owner over a pipe. Forwarding never waits: when the owner's inbox is
+#   full the datagram is dropped and counted (outcome 'forward_dropped'), as
+#   two workers blocked on each other's full inbox would never read again.
+# - "dispatcher" (elsewhere): the parent owns the socket, routes datagrams to
+#   the owning worker and sends the replies the workers hand back.
+
+WORKERS = os.cpu_count() or 2
+# DHCPServer arguments for the banner and every worker (subnet, pool_ranges,
+# scopes, port, ...); journal and metrics are set per worker below
+SERVER_CONFIG = dict(reservations=RESERVATIONS)
+JOURNAL_PATH = 'dhcp_leases'  # each worker journals its own shard to <path>.<index>
+METRICS_PORT = 9103           # worker N serves /metrics on METRICS_PORT + N
+# IP_PKTINFO only exists on newer Pythons; the Linux value is 8
+IP_PKTINFO = getattr(socket, 'IP_PKTINFO', 8 if sys.platform.startswith('linux') else None)
+MODE = 'reuseport' if hasattr(socket, 'SO_REUSEPORT') and IP_PKTINFO is not None else 'dispatcher'
+PKTINFO = struct.Struct('=I4s4s')  # ifindex, local address, header destination
+
+
+def owner_of(data, workers):
+    """Worker index that owns the client MAC in a raw DHCP datagram."""
+    return zlib.crc32(data[28:34]) % workers
+
+
+def packet_info(ancillary):
+    """(local address, header destination) from IP_PKTINFO, as ints, or (None, None)."""
+    for level, kind, value in ancillary:
+        if level == socket.IPPROTO_IP and kind == IP_PKTINFO:
+            _, local, destination = PKTINFO.unpack_from(value)
+            return struct.unpack('!I', local)[0], struct.unpack('!I', destination)[0]
+    return None, None
+
+
+def is_broadcast(destination, pool):
+    """Whether a header destination is a broadcast address."""
+    return destination == 0xFFFFFFFF or destination == pool.broadcast
+
+
+def make_shard_server(index, workers, config):
+    server = DHCPServer(**config)
+    # Every scope is split the same way, so a MAC's owner serves it in any scope
+    for scope in server.scopes:
+        scope.pool = scope.pool.shard(index, workers)
+        scope.leases = LeaseTable(scope.pool, scope.leases.offer_timeout)
+        server.metrics.add_scope(scope.name, scope.pool, scope.leases)
+    server.log.context['worker'] = index
+    server.metrics.server_name = f"dhcp-worker-{index}"
+    if METRICS_PORT:
+        start_http_server(METRICS_PORT + index, server.metrics)
+    if JOURNAL_PATH:
+        path = f"{JOURNAL_PATH}.{index}"
+        server.journal = LeaseJournal(path, partition=server.scopes.partition)
+        server.log.info('leases_restored', count=server.journal.load(server.scopes), path=path)
+    return server
+
+
+def worker_main(index, workers, config, inboxes, inbox_locks, outbox):
+    server = make_shard_server(index, workers, config)
+    inbox = inboxes[index][0]
+    sock = None
+    if MODE == 'reuseport':
+        sock = server._create_socket(reuse_port=True)
+        sock.setsockopt(socket.IPPROTO_IP, IP_PKTINFO, 1)
+    for scope in server.scopes:
+        server.log.info('serving', scope=scope.name, pool=scope.pool.describe(), addresses=len(scope.pool))
+
+    def deliver(data, addr, local_ip=None):
+        received = time.perf_counter()
+        try:
+            replies = server.handle_packet(data, addr, local_ip=local_ip)
+        except Exception as e:
+            server.metrics.outcomes['error'] += 1
+            server.log.exception('packet_error', error=str(e))
+            return
+        for response, dest in replies:
+            if sock:
+                sock.sendto(response, dest)
+            else:
+                outbox.send((response, dest))
+        if replies:
+            server.metrics.observe_latency(time.perf_counter() - received)
+
+    waitables = [inbox] + ([sock] if sock else [])
+    while True:
+        for ready in multiprocessing.connection.wait(waitables):
+            if ready is inbox:
+                data, addr, local_ip = inbox.recv()
+                deliver(data, addr, local_ip)
+                continue
+
+            data, ancillary, flags, addr = sock.recvmsg(2048, socket.CMSG_SPACE(PKTINFO.size))
+            if len(data) < 34:
+                continue
+            local_ip, destination = packet_info(ancillary)
+            owner = owner_of(data, workers)
+            if owner == index:
+                deliver(data, addr, local_ip)
+                continue
+            # Broadcasts were delivered to the owner as well; unicasts (renewals,
+            # relayed requests) were not
+            if is_broadcast(destination, server.ip_pool):
+                continue
+            try:
+                with inbox_locks[owner]:
+                    inboxes[owner][1].send((data, addr, local_ip))
+            except BlockingIOError:
+                # The client retransmits; a datagram plus its pickle is under
+                # PIPE_BUF, so a refused write never leaves half a message
+                server.metrics.outcomes['forward_dropped'] += 1
+
+
+def dispatch(sock, workers, inboxes, replies):
+    """Parent loop for dispatcher mode: route datagrams in, send replies out."""
+    waitables = [sock] + replies
+    while True:
+        for ready in multiprocessing.connection.wait(waitables):
+            if ready is sock:
+                data, addr = sock.recvfrom(2048)
+                if len(data) >= 34:
+                    inboxes[owner_of(data, workers)][1].send((data, addr, None))
+            else:
+                response, dest = ready.recv()
+                sock.sendto(response, dest)
+
+
+def run(workers=WORKERS, config=SERVER_CONFIG):
+    inboxes = [multiprocessing.Pipe(duplex=False) for _ in range(workers)]
+    inbox_locks = [multiprocessing.Lock() for _ in range(workers)]
+    if MODE == 'reuseport':
+        # Workers write to each other's inboxes; see worker_main
+        for _, writer in inboxes:
+            os.set_blocking(writer.fileno(), False)
+    reply_pipes = [multiprocessing.Pipe(duplex=False) for _ in range(workers)]
+
+    banner = DHCPServer(**config)
+    banner._print_banner()
+    print(f"Multi-process mode: {workers} workers ({MODE})\n")
+
+    processes = [
+        multiprocessing.Process(target=worker_main, daemon=True,
+                                args=(i, workers, config, inboxes, inbox_locks, reply_pipes[i][1]))
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    try:
+        if MODE == 'dispatcher':
+            dispatch(banner._create_socket(), workers, inboxes, [r for r, _ in reply_pipes])
+        else:
+            for process in processes:
+                process.join()
+    except KeyboardInterrupt:
+        print("\nStopping DHCP workers...")
+        for process in processes:
+            process.terminate()
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,226 @@
+import atexit
+import collections
+import gc
+import os
+import struct
+import threading
+import time
+
+# On-disk format (little endian)
+#
+#   <base>.snap     header + one GRANT record per live lease
+#   <base>.journal  header + GRANT/RELEASE records appended since that snapshot
+#
+# Both headers carry a generation number. Compaction writes a snapshot with
+# generation g+1 and only then starts a fresh journal with g+1, so a crash in
+# between leaves a journal that replay recognises as already folded in.
+HEADER = struct.Struct('<8sIQ')  # magic, format version, generation
+MAGIC = b'DHCPLEAS'
+VERSION = 1
+RECORD = struct.Struct('<B6sId')  # op, mac, ip, expiry
+GRANT = 1    # lease granted or renewed
+RELEASE = 2  # lease released by the client
+
+FSYNC_INTERVAL = 0.05     # group-commit window: a crash loses at most this much
+SNAPSHOT_INTERVAL = 300   # seconds between compactions...
+SNAPSHOT_MIN_RECORDS = 10000  # ...once the journal has grown by this many records
+
+
+class LeaseState:
+    """Last known lease per IP, folded from GRANT/RELEASE records.
+
+    Follows the same rules as LeaseTable: a MAC holds one address, and a
+    grant of an address moves it away from any previous holder. With several
+    lease tables (one per scope) `partition` maps an address to its table,
+    and the one-address rule applies per table.
+    """
+
+    def __init__(self, partition=None):
+        self.partition = partition
+        self.by_ip = {}   # ip -> (mac, expiry)
+        self.by_mac = {}  # (mac, partition) -> ip
+
+    def _mac_key(self, mac, ip):
+        return (mac, self.partition(ip) if self.partition else None)
+
+    def apply(self, op, mac, ip, expiry):
+        if op == GRANT:
+            key = self._mac_key(mac, ip)
+            previous = self.by_mac.get(key)
+            if previous is not None and previous != ip:
+                del self.by_ip[previous]
+            current = self.by_ip.get(ip)
+            if current is not None and current[0] != mac:
+                del self.by_mac[self._mac_key(current[0], ip)]
+            self.by_ip[ip] = (mac, expiry)
+            self.by_mac[key] = ip
+        elif op == RELEASE:
+            current = self.by_ip.get(ip)
+            if current is not None and current[0] == mac:
+                del self.by_ip[ip]
+                del self.by_mac[self._mac_key(mac, ip)]
+
+    def replay(self, body):
+        apply = self.apply
+        usable = len(body) - len(body) % RECORD.size  # drop a torn final record
+        for op, mac, ip, expiry in RECORD.iter_unpack(memoryview(body)[:usable]):
+            apply(op, mac, ip, expiry)
+        return usable // RECORD.size
+
+    def leases(self, now):
+        """(ip, mac, expiry) for every lease that hasn't expired by `now`."""
+        return [(ip, mac, expiry) for ip, (mac, expiry) in self.by_ip.items() if expiry > now]
+
+
+class LeaseJournal:
+    """Durable lease state: snapshot + append-only journal, written off the hot path.
+
+    grant() and release() only pack a record and append it to a deque. A
+    background thread drains the deque every FSYNC_INTERVAL, writes it
+    with one write() and fsyncs once for the whole group. The same thread
+    keeps a LeaseState of everything it has written, which is what it dumps
+    when compacting, so the server's LeaseTable is never read from another
+    thread.
+    """
+
+    def __init__(self, base, fsync_interval=FSYNC_INTERVAL, snapshot_interval=SNAPSHOT_INTERVAL, partition=None):
+        self.snapshot_path = base + '.snap'
+        self.journal_path = base + '.journal'
+        self.fsync_interval = fsync_interval
+        self.snapshot_interval = snapshot_interval
+        self.partition = partition
+        self.state = LeaseState(partition)
+        self.generation = 0
+        self.journal_records = 0
+        self.pending = collections.deque()
+        self.journal = None
+        self.thread = None
+        self.stopping = threading.Event()
+
+    # Hot path
+
+    def grant(self, mac, ip, expiry):
+        self.pending.append(RECORD.pack(GRANT, mac, ip, expiry))
+
+    def release(self, mac, ip):
+        self.pending.append(RECORD.pack(RELEASE, mac, ip, 0.0))
+
+    # Startup
+
+    @staticmethod
+    def _read(path):
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None, b''
+        if len(data) < HEADER.size:
+            return None, b''
+        magic, version, generation = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} lease file")
+        return generation, memoryview(data)[HEADER.size:]
+
+    def load(self, table, now=None):
+        """Replay snapshot + journal into `table` and start the writer thread.
+
+        Returns the number of leases restored.
+        """
+        if now is None:
+            now = time.time()
+        snapshot_generation, snapshot = self._read(self.snapshot_path)
+        journal_generation, journal = self._read(self.journal_path)
+        self.generation = snapshot_generation or 0
+
+        # Replay allocates only acyclic objects; don't let the collector rescan them
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            self.state.replay(snapshot)
+            if journal_generation is not None and journal_generation >= self.generation:
+                self.journal_records = self.state.replay(journal)
+            restored = table.restore(self.state.leases(now), now)
+        finally:
+            if collecting:
+                gc.enable()
+
+        if journal_generation is not None and journal_generation >= self.generation:
+            self.generation = journal_generation
+            # Reopen for appending, cutting off a torn final record
+            self.journal = open(self.journal_path, 'r+b')
+            self.journal.truncate(HEADER.size + self.journal_records * RECORD.size)
+            self.journal.seek(0, os.SEEK_END)
+        else:
+            self.journal = self._new_journal()
+        self.start()
+        return restored
+
+    # Writer thread
+
+    def start(self):
+        if self.journal is None:
+            self.journal = self._new_journal()
+        self.thread = threading.Thread(target=self._writer, name='lease-journal', daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def _writer(self):
+        last_snapshot = time.monotonic()
+        while not self.stopping.wait(self.fsync_interval):
+            self._commit()
+            if (time.monotonic() - last_snapshot >= self.snapshot_interval
+                    and self.journal_records >= max(SNAPSHOT_MIN_RECORDS, len(self.state.by_ip))):
+                self.compact()
+                last_snapshot = time.monotonic()
+        self._commit()
+
+    def _commit(self):
+        if not self.pending:
+            return
+        # append() and popleft() are atomic, so grant() and release() never
+        # wait on us and nothing appended meanwhile is lost
+        pending = self.pending
+        batch = [pending.popleft() for _ in range(len(pending))]
+        data = b''.join(batch)
+        self.journal.write(data)
+        self.journal.flush()
+        os.fsync(self.journal.fileno())
+        self.journal_records += len(batch)
+        self.state.replay(data)
+
+    def compact(self):
+        """Write the folded state as a new snapshot and start an empty journal."""
+        generation = self.generation + 1
+        leases = self.state.leases(time.time())
+        body = b''.join(RECORD.pack(GRANT, mac, ip, expiry) for ip, mac, expiry in leases)
+        self._replace(self.snapshot_path, HEADER.pack(MAGIC, VERSION, generation) + body)
+        # Expired leases stop here rather than being carried forever
+        self.state = LeaseState(self.partition)
+        self.state.replay(body)
+
+        self.generation = generation
+        self.journal.close()
+        self.journal = self._new_journal()
+        self.journal_records = 0
+
+    def _new_journal(self):
+        self._replace(self.journal_path, HEADER.pack(MAGIC, VERSION, self.generation))
+        return open(self.journal_path, 'ab')
+
+    @staticmethod
+    def _replace(path, data):
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def close(self):
+        """Flush outstanding records and stop the writer thread."""
+        if self.thread is None:
+            return
+        self.stopping.set()
+        self.thread.join()
+        self.thread = None
+        self.journal.close()
@@ -0,0 +1,149 @@
+import heapq
+
+
+class Lease:
+    __slots__ = ('ip', 'mac', 'expiry', 'bound')
+
+    def __init__(self, ip, mac, expiry, bound):
+        self.ip = ip
+        self.mac = mac
+        self.expiry = expiry
+        self.bound = bound  # False while only offered, True once ACKed
+
+
+class LeaseTable:
+    """Leases indexed by MAC and by IP, with a free-address map and an expiry heap.
+
+    - lookups by MAC or IP are dict hits
+    - free pool addresses are found with a C-level scan of a byte map
+      (one byte per pool address) starting from a rotating cursor; the pool
+      maps addresses to byte-map positions arithmetically (see AddressPool)
+    - expired leases are reclaimed by popping a min-heap; stale heap entries
+      (renewed or released leases) are skipped when they surface
+    """
+
+    def __init__(self, ip_pool, offer_timeout=60):
+        self.pool = ip_pool
+        self.offer_timeout = offer_timeout
+        self.by_mac = {}
+        self.by_ip = {}
+        self._in_use = bytearray(len(ip_pool))  # 0 = free, 1 = offered/leased
+        self._cursor = 0
+        self._used = 0
+        self._expiries = []  # (expiry, ip) min-heap
+
+    def __len__(self):
+        return len(self.by_ip)
+
+    def free_count(self):
+        return len(self._in_use) - self._used
+
+    def lookup_mac(self, mac, now):
+        lease = self.by_mac.get(mac)
+        if lease and lease.expiry > now:
+            return lease
+        return None
+
+    def lookup_ip(self, ip, now):
+        lease = self.by_ip.get(ip)
+        if lease and lease.expiry > now:
+            return lease
+        return None
+
+    def _mark(self, ip, used):
+        index = self.pool.index(ip)
+        if index is not None and self._in_use[index] != used:
+            self._in_use[index] = used
+            self._used += 1 if used else -1
+
+    def _store(self, ip, mac, expiry, bound):
+        previous = self.by_mac.get(mac)
+        if previous is not None and previous.ip != ip:
+            self._drop(previous)
+        current = self.by_ip.get(ip)
+        if current is not None and current.mac != mac:
+            self._drop(current)
+        lease = Lease(ip, mac, expiry, bound)
+        self.by_mac[mac] = lease
+        self.by_ip[ip] = lease
+        self._mark(ip, 1)
+        heapq.heappush(self._expiries, (expiry, ip))
+        return lease
+
+    def _drop(self, lease):
+        if self.by_ip.get(lease.ip) is lease:
+            del self.by_ip[lease.ip]
+            self._mark(lease.ip, 0)
+        if self.by_mac.get(lease.mac) is lease:
+            del self.by_mac[lease.mac]
+
+    def _allocate(self):
+        """Next free pool address after the cursor, or None if the pool is full."""
+        if not self._in_use:
+            return None
+        index = self._in_use.find(0, self._cursor)
+        if index < 0:
+            index = self._in_use.find(0, 0, self._cursor)
+            if index < 0:
+                return None
+        self._cursor = index + 1
+        return self.pool[index]
+
+    def offer(self, mac, now):
+        """Address to offer `mac`: its current lease/offer, else a newly held free address."""
+        lease = self.lookup_mac(mac, now)
+        if lease:
+            return lease.ip
+        self.reclaim(now)
+        ip = self._allocate()
+        if ip is None:
+            return None
+        # Hold the address for a while so it isn't offered to someone else
+        self._store(ip, mac, now + self.offer_timeout, False)
+        return ip
+
+    def assign(self, mac, ip, expiry, now):
+        """Bind (or renew) `ip` to `mac`. False if another client holds it."""
+        current = self.lookup_ip(ip, now)
+        if current and current.mac != mac:
+            return False
+        self._store(ip, mac, expiry, True)
+        return True
+
+    def release(self, ip, mac=None):
+        lease = self.by_ip.get(ip)
+        if lease is None or (mac is not None and lease.mac != mac):
+            return False
+        self._drop(lease)
+        return True
+
+    def restore(self, leases, now):
+        """Bulk-load bound (ip, mac, expiry) leases, e.g. replayed from a LeaseJournal.
+
+        Expects at most one lease per IP and per MAC; the expiry heap is
+        built once at the end instead of pushed lease by lease.
+        """
+        restored = 0
+        for ip, mac, expiry in leases:
+            if expiry <= now:
+                continue
+            lease = Lease(ip, mac, expiry, True)
+            self.by_mac[mac] = lease
+            self.by_ip[ip] = lease
+            self._mark(ip, 1)
+            self._expiries.append((expiry, ip))
+            restored += 1
+        heapq.heapify(self._expiries)
+        return restored
+
+    def reclaim(self, now):
+        """Free every lease whose expiry has passed. Returns how many were freed."""
+        freed = 0
+        while self._expiries and self._expiries[0][0] <= now:
+            expiry, ip = heapq.heappop(self._expiries)
+            lease = self.by_ip.get(ip)
+            # Skip entries superseded by a renewal, release or re-offer
+            if lease is not None and lease.expiry == expiry:
+                self._drop(lease)
+                freed += 1
+        return freed
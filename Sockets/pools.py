@@ -0,0 +1,124 @@
+import bisect
+import copy
+import ipaddress
+import socket
+import struct
+
+
+def ip_to_int(ip):
+    return struct.unpack('!I', socket.inet_aton(ip))[0]
+
+
+def int_to_ip(value):
+    return socket.inet_ntoa(struct.pack('!I', value))
+
+
+class AddressPool:
+    """A DHCP pool stored as sorted, disjoint integer ranges.
+
+    Membership, address -> index and index -> address are arithmetic on the
+    range boundaries (a bisect over the handful of ranges), so the pool costs
+    the same memory for a /16 as for a /24.
+    """
+
+    def __init__(self, subnet, ranges=None, exclusions=()):
+        network = ipaddress.ip_network(subnet, strict=False)
+        self.subnet = str(network)
+        self.network = int(network.network_address)
+        self.netmask = int(network.netmask)
+        self.broadcast = int(network.broadcast_address)
+
+        if ranges is None:
+            # Every usable host address in the subnet
+            spans = [(self.network + 1, self.broadcast - 1)]
+        else:
+            spans = [(ip_to_int(start), ip_to_int(end)) for start, end in ranges]
+        for start, end in spans:
+            if start > end or start < self.network or end > self.broadcast:
+                raise ValueError(f"Range {int_to_ip(start)}-{int_to_ip(end)} is outside {self.subnet}")
+
+        for excluded in exclusions:
+            if isinstance(excluded, (tuple, list)):
+                low, high = ip_to_int(excluded[0]), ip_to_int(excluded[1])
+            else:
+                low = high = ip_to_int(excluded)
+            spans = self._subtract(spans, low, high)
+
+        self._set_spans(self._merge(spans))
+
+    def _set_spans(self, spans):
+        self.starts = []
+        self.ends = []
+        self.offsets = []  # pool index of each range's first address
+        total = 0
+        for start, end in spans:
+            self.starts.append(start)
+            self.ends.append(end)
+            self.offsets.append(total)
+            total += end - start + 1
+        self.size = total
+
+    @staticmethod
+    def _merge(spans):
+        merged = []
+        for start, end in sorted(spans):
+            if merged and start <= merged[-1][1] + 1:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        return merged
+
+    @staticmethod
+    def _subtract(spans, low, high):
+        result = []
+        for start, end in spans:
+            if end < low or start > high:
+                result.append((start, end))
+                continue
+            if start < low:
+                result.append((start, low - 1))
+            if end > high:
+                result.append((high + 1, end))
+        return result
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, ip):
+        return self.index(ip) is not None
+
+    def index(self, ip):
+        """Position of `ip` in the pool, or None if it isn't part of it."""
+        k = bisect.bisect_right(self.starts, ip) - 1
+        if k < 0 or ip > self.ends[k]:
+            return None
+        return self.offsets[k] + ip - self.starts[k]
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError(index)
+        k = bisect.bisect_right(self.offsets, index) - 1
+        return self.starts[k] + index - self.offsets[k]
+
+    def shard(self, k, n):
+        """The k-th of n disjoint, contiguous slices of this pool (same subnet)."""
+        low = k * self.size // n
+        high = (k + 1) * self.size // n - 1
+        spans = []
+        if low <= high:
+            first, last = self[low], self[high]
+            for start, end in zip(self.starts, self.ends):
+                if end >= first and start <= last:
+                    spans.append((max(start, first), min(end, last)))
+        part = copy.copy(self)
+        part._set_spans(spans)
+        return part
+
+    def contains_network(self, ip):
+        """Whether `ip` is inside the pool's subnet at all (not just its ranges)."""
+        return ip & self.netmask == self.network
+
+    def describe(self):
+        return ', '.join(f"{int_to_ip(s)} - {int_to_ip(e)}" for s, e in zip(self.starts, self.ends))
@@ -0,0 +1,45 @@
+import collections
+
+
+class ResponseCache:
+    """Replies already sent, keyed by (xid, chaddr, message type), for retransmissions.
+
+    Clients retransmit DISCOVER and REQUEST with the same xid when a reply is
+    slow or lost. Replaying the stored bytes skips the decision path and
+    keeps the answer identical. Entries live for `ttl` seconds; past `size`
+    entries the least recently used one is evicted.
+    """
+
+    def __init__(self, ttl=10.0, size=10000):
+        self.ttl = ttl
+        self.size = size
+        self.entries = collections.OrderedDict()  # key -> (expiry, replies)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(packet):
+        buf = packet.buf
+        return (buf[4:8].tobytes() + buf[28:44].tobytes(), packet.message_type)
+
+    def get(self, key, now):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry[0] <= now:
+            del self.entries[key]
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key, replies, now):
+        self.entries[key] = (now + self.ttl, replies)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
@@ -0,0 +1,130 @@
+import ipaddress
+import struct
+
+from dhcp_packet import ResponseBuilder
+from leases import LeaseTable
+from pools import AddressPool, int_to_ip, ip_to_int
+
+
+def _mac_key(mac):
+    """Reservation MAC as the 6-byte key DHCPPacket.mac produces."""
+    if isinstance(mac, str):
+        return bytes.fromhex(mac.replace(':', '').replace('-', ''))
+    return bytes(mac)
+
+
+class Scope:
+    """One subnet the server hands out addresses in.
+
+    Owns everything that differs per subnet: the pool and its lease table,
+    static reservations, the options sent to clients, and the ResponseBuilder
+    template encoding them.
+    """
+
+    def __init__(self, name, subnet, server_ip, lease_duration=86400, pool_ranges=None, exclusions=(),
+                 router=None, dns_server='8.8.8.8', reservations=None, extra_options=None, offer_timeout=60):
+        self.name = name
+        self.server_ip = server_ip
+        self.lease_duration = lease_duration
+
+        # The router must be reachable from the subnet. For the attached
+        # subnet that is us; a relayed subnet must name its own, normally the
+        # relay agent's address there (giaddr), which is then kept out of the pool
+        network = ipaddress.ip_network(subnet, strict=False)
+        if router is None:
+            if ipaddress.ip_address(server_ip) not in network:
+                raise ValueError(f"Scope {name}: {subnet} is relayed, so it needs a router on that subnet "
+                                 f"(usually the relay agent's address)")
+            router = server_ip
+        elif ipaddress.ip_address(router) not in network:
+            raise ValueError(f"Scope {name}: router {router} is outside {subnet}")
+        self.router = router
+        self.dns_server = dns_server
+        self.extra_options = extra_options
+
+        # Static MAC to IP mappings, which like the router must be in the subnet
+        self.static_mappings = {}
+        for mac, ip in (reservations or {}).items():
+            ip = ip if isinstance(ip, int) else ip_to_int(ip)
+            if ipaddress.ip_address(ip) not in network:
+                raise ValueError(f"Scope {name}: reservation {int_to_ip(ip)} for {mac} is outside {subnet}")
+            self.static_mappings[_mac_key(mac)] = ip
+        self.static_ips = set(self.static_mappings.values())
+
+        # Reserved and infrastructure addresses never go out dynamically
+        exclusions = list(exclusions) + [server_ip, self.router] + [int_to_ip(ip) for ip in self.static_ips]
+        self.pool = AddressPool(subnet, pool_ranges, exclusions)
+        self.leases = LeaseTable(self.pool, offer_timeout)
+        self.build_responses()
+
+    def build_responses(self):
+        """(Re)encode the constant parts of every reply in this scope."""
+        options = {
+            28: struct.pack('!I', self.pool.broadcast),  # Broadcast Address
+            58: struct.pack('!I', self.lease_duration // 2),  # Renewal (T1) Time
+            59: struct.pack('!I', self.lease_duration * 7 // 8),  # Rebinding (T2) Time
+        }
+        options.update(self.extra_options or {})
+        self.responses = ResponseBuilder(ip_to_int(self.server_ip), self.lease_duration, self.pool.netmask,
+                                         ip_to_int(self.router), ip_to_int(self.dns_server), options)
+
+    def serves(self, ip):
+        """Whether `ip` may be leased in this scope (pool or reservation)."""
+        return ip in self.pool or ip in self.static_ips
+
+
+class ScopeTable:
+    """Scopes indexed by network, for relay (giaddr) and interface lookups.
+
+    Networks are kept in a dict per prefix length, so finding the scope for
+    an address is one masked dict probe per distinct prefix length in use
+    (longest first) - a handful at most, however many VLANs there are.
+    """
+
+    def __init__(self, scopes=()):
+        self.by_name = {}
+        self.by_network = {}  # (network, netmask) -> scope
+        self.netmasks = []    # distinct netmasks, longest prefix first
+        for scope in scopes:
+            self.add(scope)
+
+    def add(self, scope):
+        key = (scope.pool.network, scope.pool.netmask)
+        if key in self.by_network:
+            raise ValueError(f"Scope {scope.name} overlaps {self.by_network[key].name} ({scope.pool.subnet})")
+        self.by_name[scope.name] = scope
+        self.by_network[key] = scope
+        if scope.pool.netmask not in self.netmasks:
+            self.netmasks.append(scope.pool.netmask)
+            self.netmasks.sort(reverse=True)
+
+    def __iter__(self):
+        return iter(self.by_name.values())
+
+    def __len__(self):
+        return len(self.by_name)
+
+    def get(self, name):
+        return self.by_name.get(name)
+
+    def for_address(self, ip):
+        """Scope whose subnet contains `ip`, or None."""
+        for netmask in self.netmasks:
+            scope = self.by_network.get((ip & netmask, netmask))
+            if scope is not None:
+                return scope
+        return None
+
+    def partition(self, ip):
+        """Name of the scope `ip` belongs to, or None (LeaseJournal's partition function)."""
+        scope = self.for_address(ip)
+        return scope.name if scope else None
+
+    def restore(self, leases, now):
+        """Hand replayed (ip, mac, expiry) leases to the scopes they belong to (see LeaseJournal)."""
+        grouped = {}
+        for lease in leases:
+            scope = self.for_address(lease[0])
+            if scope is not None:
+                grouped.setdefault(scope.name, []).append(lease)
+        return sum(self.by_name[name].leases.restore(group, now) for name, group in grouped.items())